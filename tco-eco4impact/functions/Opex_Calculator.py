@@ -12,11 +12,19 @@ are preserved. Only orchestration / scenario loading is unified.
 import json
 import sys
 import os
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from operator import attrgetter
+from typing import NamedTuple, Optional
 
 from cosapp.base import System
 from cosapp.ports import Port
 from cosapp.drivers import RunOnce
 
+# Add parent directory to path to allow imports from `functions`
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from functions.db_cache import load_db
+
 # -----------------------------------------------------------------------------
 # Console encoding fix (Windows)
 # -----------------------------------------------------------------------------
@@ -25,6 +33,20 @@ if sys.platform == "win32":
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Max number of raw input values whose normalized key is kept (least recently used evicted)
+NORMALIZED_KEYS_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=NORMALIZED_KEYS_CACHE_SIZE)
+def normalize_key(value: str) -> str:
+    """
+    Upper-case, stripped and interned version of a user key ('diesel ' -> 'DIESEL').
+    Interned like the database keys, so dict lookups match by identity instead of
+    comparing text; memoized per raw value with a bounded cache (user keys of long
+    sweeps do not accumulate).
+    """
+    return sys.intern(value.upper().strip())
+
 # =============================================================================
 # SHIP PART  (Logic preserved)
 # =============================================================================
@@ -121,9 +143,7 @@ class ShipOPEXCalculator(System):
     def setup(self, db_path: str = "db_ships.json"):
         # -------------------- DATA BASE SHIPS (YELLOW) --------------------
         db_full_path = os.path.abspath(os.path.join(BASE_DIR, "..", "database", "db_ships.json"))
-
-        with open(db_full_path, "r", encoding="utf-8") as f:
-            db_data = json.load(f)
+        db_data = load_db(db_full_path)
 
         object.__setattr__(
             self,
@@ -466,6 +486,46 @@ def run_ship_scenario(scenario_name: str, inputs_path: str = "inputs\inputs_opex
 # TRUCK PART - REVISED & CORRECTED
 # =============================================================================
 
+@dataclass(slots=True)
+class TruckOpexInputs:
+    """
+    Snapshot of the TruckOPEXCalculator inwards read by compute(): each inward
+    is read once per run, then the steps and the port copy use slot loads.
+    """
+    purchase_cost: float
+    type_energy: str
+    size_vehicle: str
+    registration_country: str
+    annual_distance_travel: float
+    departure_city: str
+    arrival_city: str
+    RV: float
+    N_years: float
+    team_count: int
+    maintenance_cost: float
+    consumption_energy: float
+    fuel_multiplier: float
+    EF_CO2: float
+
+
+_TRUCK_INPUTS_KEY = attrgetter(*(f.name for f in fields(TruckOpexInputs)))
+
+
+class TruckOpexParams(NamedTuple):
+    """Database parameters of one (country, energy, vehicle size) for the truck OPEX."""
+    price_energy_km: float
+    tax_energy: float
+    tax_reg: float
+    tax_annual: float
+    regional_coefficient: float
+    tax_CO2: float
+    B_env: float
+    toll_price_per_km: Optional[float]
+    insurance_rate: float
+    energy_price: float
+    wage_of_driver: float
+
+
 class OPEXPort(Port):
     """Port for OPEX calculation inputs and outputs (trucks)."""
 
@@ -512,15 +572,16 @@ class TruckOPEXCalculator(System):
     def setup(self, db_path: str = "database\\db_truck_doc.json"):
         # Load database
         db_full_path = os.path.abspath(os.path.join(BASE_DIR, "..", "database", "db_trucks_doc.json"))
-
-        with open(db_full_path, "r", encoding="utf-8") as f:
-            db_data = json.load(f)
+        db_data = load_db(db_full_path)
 
         object.__setattr__(
             self,
             "_countries_data",
             {c["country"]: c["data_country"] for c in db_data["countries"]},
         )
+        # Parameters of the last (country, energy, size) key (see get_params)
+        object.__setattr__(self, "_params_key", None)
+        object.__setattr__(self, "_params", None)
 
         # Add port
         self.add_inward("opex", OPEXPort, desc="OPEX calculation port")
@@ -555,107 +616,135 @@ class TruckOPEXCalculator(System):
 
     # ==================== DATABASE ACCESS METHODS & HELPERS ====================
 
-    def get_country_data(self):
-        """Get the full country data."""
-        if self.registration_country not in self._countries_data:
-            raise ValueError(f"Country '{self.registration_country}' not found in database")
-        return self._countries_data[self.registration_country]
+    def get_country_data(self, vi=None):
+        """Get the full country data (of vi.registration_country, the inwards if vi is None)."""
+        country = (self if vi is None else vi).registration_country
+        if country not in self._countries_data:
+            raise ValueError(f"Country '{country}' not found in database")
+        return self._countries_data[country]
 
-    def normalize_energy_type(self):
+    def normalize_energy_type(self, vi=None):
         """Normalize energy type to uppercase for database lookup (e.g. 'diesel' -> 'DIESEL')."""
-        if not self.type_energy:
+        type_energy = (self if vi is None else vi).type_energy
+        if not type_energy:
             return "DIESEL"
-        return self.type_energy.upper().strip()
+        return normalize_key(type_energy)
 
-    def normalize_vehicle_size(self):
+    def normalize_vehicle_size(self, vi=None):
         """Normalize vehicle size to uppercase (e.g. 'n3' -> 'N3')."""
-        if not self.size_vehicle:
+        size_vehicle = (self if vi is None else vi).size_vehicle
+        if not size_vehicle:
             return "N3"
-        return self.size_vehicle.upper().strip()
+        return normalize_key(size_vehicle)
 
-    # ==================== O_TAXES CALCULATION ====================
+    def snapshot_inputs(self) -> TruckOpexInputs:
+        """Copy of the inwards read by compute(); pass it as vi to the compute_o_* steps."""
+        return TruckOpexInputs(*_TRUCK_INPUTS_KEY(self))
 
-    def compute_o_taxes(self):
+    def get_params(self, vi=None) -> TruckOpexParams:
         """
-        O_taxes = variable_taxes + fixed_taxes
+        Database parameters of a (country, energy, size), resolved once
+        per key: the compute_o_* steps are then arithmetic only (no dict walks or
+        key normalization on every compute).
+
+        :param vi: inputs already read by the caller (TruckOpexInputs), the inwards if None
         """
-        country_data = self.get_country_data()
-        
+        if vi is None:
+            vi = self
+        key = (vi.registration_country, vi.type_energy, vi.size_vehicle)
+        if key == self._params_key:
+            return self._params
+
+        # Everything is resolved from vi: the parameters cached under its key are its own
+        country_data = self.get_country_data(vi)
+
         # Normalize keys to match JSON (Case Insensitive Safety)
-        energy_key = self.normalize_energy_type()
-        vehicle_key = self.normalize_vehicle_size()
-        
-        # Retrieve Parameters from DB Structure
-        # 1. Price energy/km (inside external_factors)
-        external_factors = country_data.get("external_factors", {})
-        price_energy_km_data = external_factors.get("price_energy_km", {})
-        # Default to 'h1' profile
+        energy_key = self.normalize_energy_type(vi)
+        vehicle_key = self.normalize_vehicle_size(vi)
+
+        # Taxes: price energy/km (inside external_factors, default to 'h1' profile)
+        price_energy_km_data = country_data.get("external_factors", {}).get("price_energy_km", {})
         price_energy_km = price_energy_km_data.get("h1", {}).get(energy_key, 0.0)
-        
-        # 2. Taxes at root of data_country
-        tax_energy = country_data.get("tax_energy_c_e", {}).get(energy_key, 1.0)
-        tax_reg = country_data.get("tax_reg_c_k_L", {}).get(vehicle_key, 0.0)
-        tax_annual = country_data.get("tax_annual_c_k_L", {}).get(vehicle_key, 0.0)
-        regional_coefficient = country_data.get("regional_coefficient", 1.0)
-        tax_CO2 = country_data.get("tax_CO2_c_e", 0.0)
-        B_env = country_data.get("B_env_c_k_e", {}).get(energy_key, 0.0)
 
-        variable_taxes = (
-            self.consumption_energy
-            * price_energy_km
-            * tax_energy
-            * self.fuel_multiplier
-            * self.EF_CO2  # Uses the agnostic variable
-            * tax_CO2
-            * regional_coefficient
+        # Tolls: price table of the vehicle size (0.0 when the size or energy is missing)
+        vehicle_prices = country_data.get("tolls", {}).get("price_per_km", {}).get(vehicle_key)
+        toll_price_per_km = None if vehicle_prices is None else vehicle_prices.get(energy_key)
+
+        # Insurance: default rate if missing
+        rate_table = country_data.get("insurance", {}).get("insurance_rate_c_L_e_safety", {})
+
+        params = TruckOpexParams(
+            price_energy_km=price_energy_km,
+            # Taxes at root of data_country
+            tax_energy=country_data.get("tax_energy_c_e", {}).get(energy_key, 1.0),
+            tax_reg=country_data.get("tax_reg_c_k_L", {}).get(vehicle_key, 0.0),
+            tax_annual=country_data.get("tax_annual_c_k_L", {}).get(vehicle_key, 0.0),
+            regional_coefficient=country_data.get("regional_coefficient", 1.0),
+            tax_CO2=country_data.get("tax_CO2_c_e", 0.0),
+            B_env=country_data.get("B_env_c_k_e", {}).get(energy_key, 0.0),
+            toll_price_per_km=toll_price_per_km,
+            insurance_rate=rate_table.get(energy_key, 0.03),
+            energy_price=country_data.get("energy", {}).get("energy_price_c_e", {}).get(energy_key, 0.0),
+            wage_of_driver=country_data.get("crew", {}).get("wage_of_crew_rank", {}).get("driver", 0.0),
         )
-        fixed_taxes = tax_reg + tax_annual + B_env
+        object.__setattr__(self, "_params_key", key)
+        object.__setattr__(self, "_params", params)
+        return params
 
-        self.o_taxes = variable_taxes + fixed_taxes
+    # ==================== O_TAXES CALCULATION ====================
 
-    # ==================== O_TOLLS CALCULATION ====================
+    def compute_o_taxes(self, vi=None):
+        """
+        O_taxes = variable_taxes + fixed_taxes
+        """
+        if vi is None:
+            vi = self
+        p = self.get_params(vi)
 
-    def compute_o_tolls(self):
-        country_data = self.get_country_data()
-        tolls_db = country_data.get("tolls", {})
-        
-        energy_key = self.normalize_energy_type()
-        vehicle_key = self.normalize_vehicle_size()
+        variable_taxes = (
+            vi.consumption_energy
+            * p.price_energy_km
+            * p.tax_energy
+            * vi.fuel_multiplier
+            * vi.EF_CO2  # Uses the agnostic variable
+            * p.tax_CO2
+            * p.regional_coefficient
+        )
+        fixed_taxes = p.tax_reg + p.tax_annual + p.B_env
 
-        if vehicle_key not in tolls_db.get("price_per_km", {}):
-            # Fallback or error? defaulting to 0.0 for safety or raising Error
-            self.o_tolls = 0.0
-            return 
+        o_taxes = variable_taxes + fixed_taxes
+        self.o_taxes = o_taxes
+        return o_taxes
 
-        if energy_key not in tolls_db["price_per_km"][vehicle_key]:
-            self.o_tolls = 0.0
-            return
+    # ==================== O_TOLLS CALCULATION ====================
 
-        price_per_km = tolls_db["price_per_km"][vehicle_key][energy_key]
-        self.o_tolls = price_per_km * self.annual_distance_travel
+    def compute_o_tolls(self, vi=None):
+        if vi is None:
+            vi = self
+        price_per_km = self.get_params(vi).toll_price_per_km
+        if price_per_km is None:
+            # Fallback or error? defaulting to 0.0 for safety or raising Error
+            o_tolls = 0.0
+        else:
+            o_tolls = price_per_km * vi.annual_distance_travel
+        self.o_tolls = o_tolls
+        return o_tolls
 
     # ==================== O_INSURANCE CALCULATION ====================
 
-    def compute_o_insurance(self):
-        country_data = self.get_country_data()
-        insurance_db = country_data.get("insurance", {})
-        energy_key = self.normalize_energy_type()
-
-        rate_table = insurance_db.get("insurance_rate_c_L_e_safety", {})
-        if energy_key not in rate_table:
-            # Default rate if missing?
-            insurance_rate = 0.03 
-        else:
-            insurance_rate = rate_table[energy_key]
-
-        self.o_insurance = insurance_rate * (self.purchase_cost - self.RV)
+    def compute_o_insurance(self, vi=None):
+        if vi is None:
+            vi = self
+        o_insurance = self.get_params(vi).insurance_rate * (vi.purchase_cost - vi.RV)
+        self.o_insurance = o_insurance
+        return o_insurance
 
     # ==================== O_CREW CALCULATION ====================
 
-    def compute_o_crew(self):
-        country_data = self.get_country_data()
-        crew_db = country_data.get("crew", {})
-        wage_of_driver = crew_db.get("wage_of_crew_rank", {}).get("driver", 0.0)
+    def compute_o_crew(self, vi=None):
+        if vi is None:
+            vi = self
+        wage_of_driver = self.get_params(vi).wage_of_driver
 
         # IMPORTANT:
         #   `wage_of_driver` in the DB is already an ANNUAL full‑employer cost
@@ -663,83 +752,84 @@ class TruckOPEXCalculator(System):
         #   double‑counting the time horizon, we **do not** multiply by N_years
         #   here. Multi‑year horizons should be handled by multiplying the
         #   annual OPEX externally at TCO level.
-        self.o_crew = wage_of_driver * self.team_count
+        o_crew = wage_of_driver * vi.team_count
+        self.o_crew = o_crew
+        return o_crew
 
     # ==================== O_ENERGY CALCULATION ====================
 
-    def compute_o_energy(self):
-        country_data = self.get_country_data()
-        energy_db = country_data.get("energy", {})
-        energy_key = self.normalize_energy_type()
-
-        price_table = energy_db.get("energy_price_c_e", {})
-        if energy_key not in price_table:
-            energy_price = 0.0
-        else:
-            energy_price = price_table[energy_key]
-
-        self.o_energy = self.consumption_energy * energy_price
+    def compute_o_energy(self, vi=None):
+        if vi is None:
+            vi = self
+        o_energy = vi.consumption_energy * self.get_params(vi).energy_price
+        self.o_energy = o_energy
+        return o_energy
 
     # ==================== MAIN COMPUTE ====================
 
     def compute(self):
-        self.compute_o_taxes()
-        self.compute_o_tolls()
-        self.compute_o_insurance()
-        self.compute_o_crew()
-        self.compute_o_energy()
-
-        self.o_opex_total = (
-            self.o_taxes
-            + self.o_tolls
-            + self.o_insurance
-            + self.o_crew
-            + self.o_energy
-            + self.maintenance_cost
+        # Inwards read once; each step returns its value: the total and the port copy use the locals
+        vi = self.snapshot_inputs()
+        o_taxes = self.compute_o_taxes(vi)
+        o_tolls = self.compute_o_tolls(vi)
+        o_insurance = self.compute_o_insurance(vi)
+        o_crew = self.compute_o_crew(vi)
+        o_energy = self.compute_o_energy(vi)
+
+        o_opex_total = (
+            o_taxes
+            + o_tolls
+            + o_insurance
+            + o_crew
+            + o_energy
+            + vi.maintenance_cost
         )
+        self.o_opex_total = o_opex_total
 
         # Output assignment
         p = self.opex
-        p.purchase_cost = self.purchase_cost
-        p.type_energy = self.type_energy
-        p.size_vehicle = self.size_vehicle
-        p.registration_country = self.registration_country
-        p.annual_distance_travel = self.annual_distance_travel
-        p.departure_city = self.departure_city
-        p.arrival_city = self.arrival_city
-        p.RV = self.RV
-        p.N_years = self.N_years
-        p.team_count = self.team_count
-        p.maintenance_cost = self.maintenance_cost
-        p.consumption_energy = self.consumption_energy
-        p.fuel_multiplier = self.fuel_multiplier
-        p.EF_CO2 = self.EF_CO2
-        p.o_taxes = self.o_taxes
-        p.o_tolls = self.o_tolls
-        p.o_insurance = self.o_insurance
-        p.o_crew = self.o_crew
-        p.o_energy = self.o_energy
-        p.o_opex_total = self.o_opex_total
+        p.purchase_cost = vi.purchase_cost
+        p.type_energy = vi.type_energy
+        p.size_vehicle = vi.size_vehicle
+        p.registration_country = vi.registration_country
+        p.annual_distance_travel = vi.annual_distance_travel
+        p.departure_city = vi.departure_city
+        p.arrival_city = vi.arrival_city
+        p.RV = vi.RV
+        p.N_years = vi.N_years
+        p.team_count = vi.team_count
+        p.maintenance_cost = vi.maintenance_cost
+        p.consumption_energy = vi.consumption_energy
+        p.fuel_multiplier = vi.fuel_multiplier
+        p.EF_CO2 = vi.EF_CO2
+        p.o_taxes = o_taxes
+        p.o_tolls = o_tolls
+        p.o_insurance = o_insurance
+        p.o_crew = o_crew
+        p.o_energy = o_energy
+        p.o_opex_total = o_opex_total
 
     def print_results(self):
-        print("\n" + "=" * 80)
-        print("TRUCK OPEX CALCULATION RESULTS")
-        print("=" * 80)
-        print(f"Country: {self.registration_country}")
-        print(f"Vehicle Class: {self.size_vehicle}")
-        print(f"Energy Type: {self.type_energy}")
-        print(f"Annual Distance: {self.annual_distance_travel:.2f} km")
-        print(f"Purchase Cost: {self.purchase_cost:.2f} EUR")
-        print("-" * 80)
-        print(f"→ TOTAL O_TAXES: {self.o_taxes:.2f} EUR")
-        print(f"→ TOTAL O_TOLLS: {self.o_tolls:.2f} EUR")
-        print(f"→ TOTAL O_INSURANCE: {self.o_insurance:.2f} EUR")
-        print(f"→ TOTAL O_CREW: {self.o_crew:.2f} EUR")
-        print(f"→ TOTAL O_ENERGY: {self.o_energy:.2f} EUR")
-        print(f"→ Annual Maintenance: {self.maintenance_cost:.2f} EUR")
-        print("\n" + "=" * 80)
-        print(f"TOTAL OPEX: {self.o_opex_total:.2f} EUR")
-        print("=" * 80 + "\n")
+        # One write for the whole report (called only for verbose runs)
+        rule = "=" * 80
+        print(f"\n{rule}\n"
+              f"TRUCK OPEX CALCULATION RESULTS\n"
+              f"{rule}\n"
+              f"Country: {self.registration_country}\n"
+              f"Vehicle Class: {self.size_vehicle}\n"
+              f"Energy Type: {self.type_energy}\n"
+              f"Annual Distance: {self.annual_distance_travel:.2f} km\n"
+              f"Purchase Cost: {self.purchase_cost:.2f} EUR\n"
+              f"{'-' * 80}\n"
+              f"→ TOTAL O_TAXES: {self.o_taxes:.2f} EUR\n"
+              f"→ TOTAL O_TOLLS: {self.o_tolls:.2f} EUR\n"
+              f"→ TOTAL O_INSURANCE: {self.o_insurance:.2f} EUR\n"
+              f"→ TOTAL O_CREW: {self.o_crew:.2f} EUR\n"
+              f"→ TOTAL O_ENERGY: {self.o_energy:.2f} EUR\n"
+              f"→ Annual Maintenance: {self.maintenance_cost:.2f} EUR\n"
+              f"\n{rule}\n"
+              f"TOTAL OPEX: {self.o_opex_total:.2f} EUR\n"
+              f"{rule}\n")
 
 
 def run_truck_scenario(
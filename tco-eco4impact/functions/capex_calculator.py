@@ -13,16 +13,18 @@ SYSTEM OUTPUTS (Calculated results)
    - Vehicle_Cost, Infrastructure_Cost, Taxes, Financing, Subsidies, Total_CAPEX
 """
 
-import json
+import math
 import sys
 import os
-import numpy as np
+from types import MappingProxyType
 from cosapp.base import System
 from cosapp.drivers import RunOnce
 
 # Add parent directory to path to allow imports from `models`
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from models.vehicle_port import VehiclePropertiesPort
+from models.fleet_energy import FleetEnergy
+from functions.db_cache import load_db
 
 
 if sys.platform == "win32":
@@ -39,6 +41,37 @@ POWERTRAIN_TYPES = [
     'DIESEL', 'BIO_DIESEL', 'HVO', 'E_DIESEL', 'HEV'
 ]
 
+# Powertrains using charging (instead of fueling) infrastructure
+CHARGING_POWERTRAINS = frozenset({'BET', 'PHEV'})
+
+# Powertrains monitored by the H2 / gas software packages
+H2_POWERTRAINS = frozenset({'FCET', 'H2_ICE'})
+GAS_POWERTRAINS = frozenset({'GNV', 'LNG'})
+
+# Fueling station used by each non-electric powertrain
+STATION_TYPE_MAP = MappingProxyType({
+    'DIESEL': 'diesel',
+    'BIO_DIESEL': 'diesel',
+    'HVO': 'hvo',
+    'E_DIESEL': 'diesel',
+    'HEV': 'diesel',
+    'FCET': 'H2_ICE',
+    'H2_ICE': 'H2_ICE',
+    'GNV': 'GNV',
+    'LNG': 'LNG'
+})
+
+
+def _fleet_content(vehicle_dict) -> tuple:
+    """
+    Signature of the fleet energy data: a vehicle_dict by its content (edits in
+    place change it), a FleetEnergy by identity (its columns are not edited after
+    construction; the object is held, so its id cannot be reused).
+    """
+    if isinstance(vehicle_dict, FleetEnergy):
+        return (id(vehicle_dict), vehicle_dict)
+    return tuple((vehicle_id, tuple(vdata.items())) for vehicle_id, vdata in vehicle_dict.items())
+
 
 # ============================================================================
 # 1. VEHICLE CAPEX CALCULATOR
@@ -63,15 +96,24 @@ class VehicleCAPEXCalculator(System):
             else:
                 db_path = os.path.join(db_folder, "db_trucks.json")
         
-        full_db_path = db_path
-        with open(full_db_path, "r", encoding="utf-8") as f:
-            db_data = json.load(f)
+        # Shared, read-only copy of the database (parsed once per process)
+        db_data = load_db(db_path)
         
         object.__setattr__(self, "_vehicle_type", vehicle_type.lower())
         
         countries_dict = {c['country']: c['data_country'] for c in db_data.get("countries", [])}
-        object.__setattr__(self, "_db", db_data)
+        # Subsidies are stored per year: use int keys so lookups need no str() per call.
+        # The shared database is not modified: only the country entry is copied.
+        for country, country_data in countries_dict.items():
+            subsidies = country_data.get('subsidies')
+            if subsidies:
+                countries_dict[country] = dict(country_data, subsidies={
+                    int(year) if year.isdigit() else year: values for year, values in subsidies.items()
+                })
         object.__setattr__(self, "_countries", countries_dict)
+        object.__setattr__(self, "_specialized_key", None)
+        object.__setattr__(self, "_fleet_sig", None)
+        object.__setattr__(self, "_fleet", None)
         
         # -------------------- PORTS --------------------
         self.add_input(VehiclePropertiesPort, 'in_vehicle_properties')
@@ -126,24 +168,28 @@ class VehicleCAPEXCalculator(System):
     
     def get_software_cost(self) -> float:
         """Get software cost based on powertrain type."""
+        base, smart_addon = self._software_cost_params()
+        if self.in_vehicle_properties.smart_charging_enabled:
+            base += smart_addon
+        return base
+
+    def _software_cost_params(self):
+        """(base cost, smart charging addon) of the software for the current powertrain."""
         vp = self.in_vehicle_properties
         country_data = self.get_country_data()
         software = country_data.get('infrastructure', {}).get('software', {})
-        
-        if vp.type_energy in ['BET', 'PHEV']:
+
+        if vp.type_energy in CHARGING_POWERTRAINS:
             bet_data = software.get('BET', {})
-            base = bet_data.get('base_cost_eur', 0.0)
-            if vp.smart_charging_enabled:
-                base += bet_data.get('load_management_addon_eur', 0.0)
-            return base
-        elif vp.type_energy in ['FCET', 'H2_ICE']:
+            return bet_data.get('base_cost_eur', 0.0), bet_data.get('load_management_addon_eur', 0.0)
+        elif vp.type_energy in H2_POWERTRAINS:
             fcet_data = software.get('FCET', {})
-            return fcet_data.get('H2_ICE_monitoring_cost_eur', 0.0)
-        elif vp.type_energy in ['GNV', 'LNG']:
+            return fcet_data.get('H2_ICE_monitoring_cost_eur', 0.0), 0.0
+        elif vp.type_energy in GAS_POWERTRAINS:
             key = 'GNV' if vp.type_energy == 'GNV' else 'LNG'
             gas_data = software.get(key, {})
-            return gas_data.get('gas_monitoring_cost_eur', 0.0)
-        return 0.0
+            return gas_data.get('gas_monitoring_cost_eur', 0.0), 0.0
+        return 0.0, 0.0
     
     def get_taxes_params(self):
         """Get tax parameters from database."""
@@ -158,7 +204,7 @@ class VehicleCAPEXCalculator(System):
         vp = self.in_vehicle_properties
         country_data = self.get_country_data()
         subsidies = country_data.get('subsidies', {})
-        year_data = subsidies.get(str(vp.year), {})
+        year_data = subsidies.get(vp.year, {})
         weight_data = year_data.get(vp.vehicle_weight_class, {})
         
         vehicle_subsidy = weight_data.get('vehicle_subsidies', {}).get(vp.type_energy, 0.0)
@@ -174,31 +220,93 @@ class VehicleCAPEXCalculator(System):
         country_data = self.get_country_data()
         return country_data.get('financing', {})
 
+    # ==================== POWERTRAIN SPECIALIZATION ====================
+
+    def _specialize(self):
+        """
+        Bind the powertrain-specific steps (fleet energy, infrastructure) and
+        pre-resolve their database parameters for the current type_energy and
+        country. Resolved once per (type_energy, country), not on every compute:
+        compute_c_infrastructure_cost and the infrastructure steps are then
+        straight-line arithmetic, without powertrain branches.
+        """
+        vp = self.in_vehicle_properties
+        key = (vp.type_energy, vp.registration_country)
+        if key == self._specialized_key:
+            return
+
+        if vp.type_energy in CHARGING_POWERTRAINS:
+            object.__setattr__(self, "_fleet_energy_step", self._fleet_energy_charging)
+            object.__setattr__(self, "_infrastructure_step", self._compute_charging_infrastructure)
+            object.__setattr__(self, "_charger_params", (
+                self.get_charger_params('slow'),
+                self.get_charger_params('fast'),
+                self.get_charger_params('ultra'),
+            ))
+        else:
+            station_type = STATION_TYPE_MAP.get(vp.type_energy, 'diesel')
+            object.__setattr__(self, "_fleet_energy_step", self._fleet_energy_fueling)
+            object.__setattr__(self, "_infrastructure_step", self._compute_fueling_infrastructure)
+            station_params = self.get_station_params(station_type)
+            object.__setattr__(self, "_station_type", station_type)
+            object.__setattr__(self, "_station_params", station_params)
+            # Grid connection cost per station (0 for diesel / HVO stations)
+            if station_type == 'H2_ICE':
+                grid_cost = station_params.get('electrolyzer_grid_connection_cost_eur', 0.0)
+            elif station_type in GAS_POWERTRAINS:
+                grid_cost = station_params.get('electricity_connection_cost_eur', 0.0)
+            else:
+                grid_cost = 0.0
+            object.__setattr__(self, "_station_grid_cost", grid_cost)
+
+        # Per-powertrain infrastructure costs: software, site preparation, safety, licensing
+        country_data = self.get_country_data()
+        infrastructure = country_data.get('infrastructure', {})
+        object.__setattr__(self, "_software_costs", self._software_cost_params())
+        object.__setattr__(self, "_site_cost", infrastructure.get('site_preparation', {}).get(
+            'cost_eur', {}).get(vp.type_energy, 0.0))
+        object.__setattr__(self, "_safety_cost_per_station", infrastructure.get('safety', {}).get(
+            'cost_per_station_eur', {}).get(vp.type_energy, 0.0))
+        object.__setattr__(self, "_licensing_cost", country_data.get('licensing', {}).get(vp.type_energy, 0.0))
+        object.__setattr__(self, "_specialized_key", key)
+
     # ==================== FLEET ENERGY CALCULATION ====================
     
     def compute_fleet_energy(self):
-        """Calculate total energy consumption for the fleet."""
+        """
+        Calculate total energy consumption for the fleet.
+
+        Skipped when the fleet data (see _fleet_content) and type_energy are
+        unchanged since the last call: a vehicle_dict edited in place is
+        recomputed, an unchanged one is not converted again.
+        """
         vp = self.in_vehicle_properties
+        vehicle_dict = vp.vehicle_dict
+        sig = (vp.type_energy, _fleet_content(vehicle_dict))
+        if sig == self._fleet_sig:
+            return
+
+        self._specialize()
+        if isinstance(vehicle_dict, FleetEnergy):
+            fleet = vehicle_dict
+        else:
+            fleet = FleetEnergy.from_vehicle_dict(vehicle_dict)
+        object.__setattr__(self, "_fleet", fleet)
+
         self.E_total_slow = 0.0
         self.E_total_fast = 0.0
         self.E_total_ultra = 0.0
         self.E_total_private = 0.0
-        
-        if vp.type_energy in ['BET', 'PHEV']:
-            for vid, vdata in vp.vehicle_dict.items():
-                E = vdata.get('E_t', 0.0)
-                S = vdata.get('Private_S_t', 0.0)
-                F = vdata.get('Private_F_t', 0.0)   
-                U = vdata.get('Private_U_t', 0.0)
-                
-                self.E_total_slow += E * S
-                self.E_total_fast += E * F
-                self.E_total_ultra += E * U
-        else:
-            for vid, vdata in vp.vehicle_dict.items():
-                E = vdata.get('E_t', 0.0)
-                P = vdata.get('Private_t', 0.0)
-                self.E_total_private += E * P
+        self._fleet_energy_step(fleet)
+        object.__setattr__(self, "_fleet_sig", sig)
+
+    def _fleet_energy_charging(self, fleet):
+        """Fleet energy split by charger type (BET/PHEV)."""
+        self.E_total_slow, self.E_total_fast, self.E_total_ultra = fleet.charging_totals()
+
+    def _fleet_energy_fueling(self, fleet):
+        """Fleet energy refueled at private stations (non-electric)."""
+        self.E_total_private = fleet.private_total()
 
     # ==================== C_VEHICLE_COST ====================
     
@@ -206,42 +314,41 @@ class VehicleCAPEXCalculator(System):
         """Calculate vehicle acquisition cost."""
         vp = self.in_vehicle_properties
         if vp.is_new:
-            self.c_vehicle_cost = vp.purchase_cost
+            c_vehicle_cost = vp.purchase_cost
         elif vp.owns_vehicle:
-            self.c_vehicle_cost = vp.conversion_cost + vp.certification_cost
+            c_vehicle_cost = vp.conversion_cost + vp.certification_cost
         else:
-            self.c_vehicle_cost = vp.purchase_cost + vp.conversion_cost + vp.certification_cost
+            c_vehicle_cost = vp.purchase_cost + vp.conversion_cost + vp.certification_cost
+        self.c_vehicle_cost = c_vehicle_cost
+        return c_vehicle_cost
 
     # ==================== C_INFRASTRUCTURE_COST ====================
     
     def compute_c_infrastructure_cost(self):
         """Calculate infrastructure cost per vehicle."""
         vp = self.in_vehicle_properties
-        if vp.type_energy in ['BET', 'PHEV']:
-            self._compute_charging_infrastructure()
-        else:
-            self._compute_fueling_infrastructure()
+        self._specialize()
+        self._infrastructure_step()
         
         # Software cost
-        software_cost = self.get_software_cost() / vp.vehicle_number
+        software_base, smart_addon = self._software_costs
+        if vp.smart_charging_enabled:
+            software_base += smart_addon
+        software_cost = software_base / vp.vehicle_number
         
         # Site preparation
-        country_data = self.get_country_data()
-        site_cost = country_data.get('infrastructure', {}).get('site_preparation', {}).get(
-            'cost_eur', {}
-        ).get(vp.type_energy, 0.0) / vp.vehicle_number
+        site_cost = self._site_cost / vp.vehicle_number
         
         # Safety
         n_stations_calc = vp.n_stations if vp.n_stations else 1
-        safety_data = country_data.get('infrastructure', {}).get('safety', {})
-        safety_cost = safety_data.get('cost_per_station_eur', {}).get(vp.type_energy, 0.0) * n_stations_calc
+        safety_cost = self._safety_cost_per_station * n_stations_calc
         safety_cost = safety_cost / vp.vehicle_number
         
         # Licensing
-        licensing_cost = country_data.get('licensing', {}).get(vp.type_energy, 0.0) / vp.vehicle_number
+        licensing_cost = self._licensing_cost / vp.vehicle_number
         
         # Total infrastructure
-        self.c_infrastructure_cost = (
+        c_infrastructure_cost = (
             self.c_infrastructure_hardware +
             software_cost +
             self.c_infrastructure_grid +
@@ -250,13 +357,13 @@ class VehicleCAPEXCalculator(System):
             safety_cost +
             licensing_cost
         )
+        self.c_infrastructure_cost = c_infrastructure_cost
+        return c_infrastructure_cost
     
     def _compute_charging_infrastructure(self):
         """Compute charging infrastructure for BET/PHEV."""
         vp = self.in_vehicle_properties
-        slow_params = self.get_charger_params('slow')
-        fast_params = self.get_charger_params('fast')
-        ultra_params = self.get_charger_params('ultra')
+        slow_params, fast_params, ultra_params = self._charger_params
         
         # Calculate number of chargers if not specified
         if vp.n_slow is None and vp.n_fast is None and vp.n_ultra is None:
@@ -274,20 +381,16 @@ class VehicleCAPEXCalculator(System):
             H_cap_fast = fast_params.get('operating_hours_per_day', 20) * fast_params.get('operating_days_per_year', 365)
             H_cap_ultra = ultra_params.get('operating_hours_per_day', 20) * ultra_params.get('operating_days_per_year', 365)
             
-            self.n_slow_calculated = int(np.ceil(H_demand_slow / H_cap_slow)) if H_demand_slow > 0 else 0
-            self.n_fast_calculated = int(np.ceil(H_demand_fast / H_cap_fast)) if H_demand_fast > 0 else 0
-            self.n_ultra_calculated = int(np.ceil(H_demand_ultra / H_cap_ultra)) if H_demand_ultra > 0 else 0
+            self.n_slow_calculated = math.ceil(H_demand_slow / H_cap_slow) if H_demand_slow > 0 else 0
+            self.n_fast_calculated = math.ceil(H_demand_fast / H_cap_fast) if H_demand_fast > 0 else 0
+            self.n_ultra_calculated = math.ceil(H_demand_ultra / H_cap_ultra) if H_demand_ultra > 0 else 0
         else:
             self.n_slow_calculated = vp.n_slow or 0
             self.n_fast_calculated = vp.n_fast or 0
             self.n_ultra_calculated = vp.n_ultra or 0
         
         # Calculate shares for this vehicle
-        vdata = vp.vehicle_dict.get(str(vp.vehicle_id), {})
-        E = vdata.get('E_t', 0.0)   
-        S = vdata.get('Private_S_t', 0.0)
-        F = vdata.get('Private_F_t', 0.0)
-        U = vdata.get('Private_U_t', 0.0)
+        E, S, F, U, _ = self._fleet.vehicle(vp.vehicle_id)
         share_slow = (E * S / self.E_total_slow) if self.E_total_slow > 0 else 0
         share_fast = (E * F / self.E_total_fast) if self.E_total_fast > 0 else 0
         share_ultra = (E * U / self.E_total_ultra) if self.E_total_ultra > 0 else 0 
@@ -324,44 +427,16 @@ class VehicleCAPEXCalculator(System):
     def _compute_fueling_infrastructure(self):
         """Compute fueling infrastructure for non-electric vehicles."""
         vp = self.in_vehicle_properties
-        # Determine station type mapping
-        station_type_map = {
-            'DIESEL': 'diesel',
-            'BIO_DIESEL': 'diesel',
-            'HVO': 'hvo',
-            'E_DIESEL': 'diesel',
-            'HEV': 'diesel',
-            'FCET': 'H2_ICE',
-            'H2_ICE': 'H2_ICE',
-            'GNV': 'GNV',
-            'LNG': 'LNG'
-        }
-        
-        station_type = station_type_map.get(vp.type_energy, 'diesel')
-        
-        station_params = self.get_station_params(station_type)
+        station_params = self._station_params
         n_stations_calc = vp.n_stations if vp.n_stations else 1
-        vdata = vp.vehicle_dict.get(str(vp.vehicle_id), {})
-        E = vdata.get('E_t', 0.0)   
-        P = vdata.get('Private_t', 0.0)
+        E, _, _, _, P = self._fleet.vehicle(vp.vehicle_id)
         share_private = (E * P / self.E_total_private) if self.E_total_private > 0 else 0
       
         # Hardware
         self.c_infrastructure_hardware = station_params.get('hardware_cost_per_station_eur', 0.0) * share_private * n_stations_calc 
         
         # Grid connection
-        if station_type == 'H2_ICE':
-            self.c_infrastructure_grid = (
-                n_stations_calc * 
-                station_params.get('electrolyzer_grid_connection_cost_eur', 0.0) * share_private
-            )
-        elif station_type in ['GNV', 'LNG']:
-            self.c_infrastructure_grid = (
-                n_stations_calc * 
-                station_params.get('electricity_connection_cost_eur', 0.0) * share_private
-            )
-        else:
-            self.c_infrastructure_grid = 0.0
+        self.c_infrastructure_grid = n_stations_calc * self._station_grid_cost * share_private
         
         # Installation
         self.c_infrastructure_installation = (
@@ -375,13 +450,21 @@ class VehicleCAPEXCalculator(System):
     
     def compute_c_taxes(self):
         """Calculate registration taxes."""
-        self.c_taxes = self.get_taxes_params()
+        c_taxes = self.get_taxes_params()
+        self.c_taxes = c_taxes
+        return c_taxes
 
     # ==================== C_SUBSIDIES ====================
     
-    def compute_c_subsidies(self):
-        """Calculate total subsidies (vehicle + infrastructure)."""
+    def compute_c_subsidies(self, infrastructure_cost: float = None):
+        """
+        Calculate total subsidies (vehicle + infrastructure).
+
+        :param infrastructure_cost: value just computed by the caller (c_infrastructure_cost if None)
+        """
         vp = self.in_vehicle_properties
+        if infrastructure_cost is None:
+            infrastructure_cost = self.c_infrastructure_cost
         subsidies_params = self.get_subsidies_params()
         
         # Vehicle subsidy
@@ -389,15 +472,23 @@ class VehicleCAPEXCalculator(System):
         
         # Infrastructure subsidy
         infra_rate = subsidies_params.get('infrastructure_subsidy_rate', 0.0)
-        infrastructure_subsidy = self.c_infrastructure_cost * infra_rate
+        infrastructure_subsidy = infrastructure_cost * infra_rate
         
-        self.c_subsidies = vehicle_subsidy + (infrastructure_subsidy / vp.vehicle_number)
+        c_subsidies = vehicle_subsidy + (infrastructure_subsidy / vp.vehicle_number)
+        self.c_subsidies = c_subsidies
+        return c_subsidies
 
     # ==================== C_FINANCING_COST ====================
     
-    def compute_c_financing_cost(self):
-        """Calculate financing cost and CRF."""
+    def compute_c_financing_cost(self, vehicle_cost: float = None):
+        """
+        Calculate financing cost and CRF, returned as (c_financing_cost, c_crf).
+
+        :param vehicle_cost: value just computed by the caller (c_vehicle_cost if None)
+        """
         vp = self.in_vehicle_properties
+        if vehicle_cost is None:
+            vehicle_cost = self.c_vehicle_cost
         fin_params = self.get_financing_params()
         
         base_rate = fin_params.get('base_interest_rate', 0.04)
@@ -407,15 +498,18 @@ class VehicleCAPEXCalculator(System):
         
         # Origination fee
         origination_rate = fin_params.get('origination_fee_rate', 0.01)
-        self.c_financing_cost = self.c_vehicle_cost * origination_rate
+        c_financing_cost = vehicle_cost * origination_rate
         
         # CRF calculation
         r = adjusted_rate
         n = vp.loan_years
         if r > 0:
-            self.c_crf = (r * (1 + r)**n) / ((1 + r)**n - 1)
+            c_crf = (r * (1 + r)**n) / ((1 + r)**n - 1)
         else:
-            self.c_crf = 1.0
+            c_crf = 1.0
+        self.c_financing_cost = c_financing_cost
+        self.c_crf = c_crf
+        return c_financing_cost, c_crf
 
     # ==================== MAIN COMPUTE ====================
     
@@ -424,21 +518,22 @@ class VehicleCAPEXCalculator(System):
         # Calculate fleet energy totals
         self.compute_fleet_energy()
         
-        # Calculate each component
-        self.compute_c_vehicle_cost()
-        self.compute_c_infrastructure_cost()
-        self.compute_c_taxes()
-        self.compute_c_subsidies()
-        self.compute_c_financing_cost()
+        # Calculate each component (values passed along as locals, not re-read from the outwards)
+        c_vehicle_cost = self.compute_c_vehicle_cost()
+        c_infrastructure_cost = self.compute_c_infrastructure_cost()
+        c_taxes = self.compute_c_taxes()
+        c_subsidies = self.compute_c_subsidies(c_infrastructure_cost)
+        c_financing_cost, c_crf = self.compute_c_financing_cost(c_vehicle_cost)
         
         # Total CAPEX
-        self.c_capex_total = (
-            self.c_vehicle_cost +
-            self.c_infrastructure_cost +
-            self.c_taxes +
-            self.c_financing_cost -
-            self.c_subsidies
+        c_capex_total = (
+            c_vehicle_cost +
+            c_infrastructure_cost +
+            c_taxes +
+            c_financing_cost -
+            c_subsidies
         )
+        self.c_capex_total = c_capex_total
         
         # CAPEX per year
-        self.c_capex_per_vehicle = self.c_capex_total * self.c_crf
+        self.c_capex_per_vehicle = c_capex_total * c_crf
@@ -0,0 +1,32 @@
+"""
+Shared in-memory cache of the JSON databases.
+
+Every calculator System used to parse and keep its own copy of the database.
+load_db() parses each file once per process (re-read if the file changes) and
+returns the same object to every caller, so the cached data must be treated
+as read-only. Object keys are interned, so lookups with interned keys (string
+literals, normalized user keys) match by identity.
+"""
+import os
+import sys
+import json
+
+_DB_CACHE = {}
+
+
+def _interned_dict(pairs):
+    return {sys.intern(k): v for k, v in pairs}
+
+
+def load_db(db_path: str) -> dict:
+    """Parsed JSON database at db_path, shared by all callers (read-only)."""
+    db_path = os.path.abspath(db_path)
+    mtime = os.path.getmtime(db_path)
+    cached = _DB_CACHE.get(db_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with open(db_path, "r", encoding="utf-8") as f:
+        db_data = json.load(f, object_pairs_hook=_interned_dict)
+    _DB_CACHE[db_path] = (mtime, db_data)
+    return db_data
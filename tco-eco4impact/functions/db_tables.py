@@ -0,0 +1,120 @@
+"""
+Dense NumPy tables for the RV database parameters.
+
+The RV lookups are purely numeric and keyed by (country, type_energy). Instead
+of walking nested JSON dicts for every vehicle, the parameters are packed once
+into dense matrices indexed by (country_idx, energy_idx, metric_idx) and, when
+built with tools/build_db.py, persisted next to the JSON as a `.npz` file.
+"""
+import os
+import numpy as np
+
+from functions.db_cache import load_db
+
+# Country parameters: (path in data_country, per-energy table?)
+RV_COUNTRY_METRICS = {
+    "depreciation_rate_per_year": (("depreciation", "depreciation_rate_per_year"), True),
+    "depreciation_rate_by_usage": (("depreciation", "depreciation_rate_by_usage"), True),
+    "coef_depreciation_maintenance": (("depreciation", "coef_depreciation_maintenance"), True),
+    "yearly_obsolescence_rate": (("yearly_obsolescence_rate",), True),
+    "energy_price_factor": (("external_factors", "energy_price_factor"), True),
+    "subsidies_factor": (("external_factors", "subsidies_factor"), True),
+    "CO2_taxes_factor": (("external_factors", "CO2_taxes_factor"), False),
+}
+
+# Vehicle parameters (per energy type, NaN where not defined)
+RV_VEHICLE_METRICS = ["heating_value", "consumption_benchmark", "n_ev", "n_ice",
+                      "d_slow", "d_fast", "d_ultra", "k_d"]
+
+COUNTRY_METRIC_IDX = {name: i for i, name in enumerate(RV_COUNTRY_METRICS)}
+VEHICLE_METRIC_IDX = {name: i for i, name in enumerate(RV_VEHICLE_METRICS)}
+
+# Loaded tables by database path, with the file times they were loaded at
+_TABLES_CACHE = {}
+
+
+def tables_path(db_path: str) -> str:
+    """Path of the `.npz` tables built from a JSON database."""
+    return os.path.splitext(db_path)[0] + "_rv.npz"
+
+
+def build_rv_tables(db: dict) -> dict:
+    """
+    Pack the RV parameters of a loaded database into dense arrays.
+
+    :return: dict with 'countries', 'energy_types' (name arrays),
+             'country_params' (n_countries, n_energy, n_metrics) and
+             'vehicle_params' (n_energy, n_metrics)
+    """
+    countries = [c['country'] for c in db['countries']]
+    data = [c['data_country'] for c in db['countries']]
+
+    energy_types = []
+    for dc in data:
+        for te in dc["depreciation"]["depreciation_rate_per_year"]:
+            if te not in energy_types:
+                energy_types.append(te)
+    for table in db['vehicle'].values():
+        for te in table:
+            if te not in energy_types:
+                energy_types.append(te)
+
+    country_params = np.full((len(countries), len(energy_types), len(RV_COUNTRY_METRICS)), np.nan)
+    for ci, dc in enumerate(data):
+        for mi, (path, per_energy) in enumerate(RV_COUNTRY_METRICS.values()):
+            node = dc
+            for key in path:
+                node = node[key]
+            if not per_energy:
+                country_params[ci, :, mi] = node
+                continue
+            for ei, te in enumerate(energy_types):
+                if te in node:
+                    country_params[ci, ei, mi] = node[te]
+
+    vehicle_params = np.full((len(energy_types), len(RV_VEHICLE_METRICS)), np.nan)
+    for mi, name in enumerate(RV_VEHICLE_METRICS):
+        table = db['vehicle'].get(name, {})
+        for ei, te in enumerate(energy_types):
+            if te in table:
+                vehicle_params[ei, mi] = table[te]
+
+    return {
+        'countries': np.array(countries),
+        'energy_types': np.array(energy_types),
+        'country_params': country_params,
+        'vehicle_params': vehicle_params,
+    }
+
+
+def save_rv_tables(tables: dict, path: str):
+    np.savez_compressed(path, **tables)
+
+
+def load_rv_tables(db_path: str, db: dict = None) -> dict:
+    """
+    Load the RV tables for a JSON database.
+
+    Uses the prebuilt `.npz` when it is present and not older than the JSON;
+    otherwise the tables are built from `db` (or from the JSON file). The
+    result is shared by every caller of the same database in the process
+    (read-only arrays), and reloaded only when one of the files changes.
+    """
+    db_path = os.path.abspath(db_path)
+    npz_path = tables_path(db_path)
+    json_mtime = os.path.getmtime(db_path)
+    npz_mtime = os.path.getmtime(npz_path) if os.path.exists(npz_path) else None
+    stamp = (json_mtime, npz_mtime)
+    cached = _TABLES_CACHE.get(db_path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    if npz_mtime is not None and npz_mtime >= json_mtime:
+        with np.load(npz_path) as npz:
+            tables = {name: npz[name] for name in npz.files}
+    else:
+        tables = build_rv_tables(load_db(db_path) if db is None else db)
+    for array in tables.values():
+        array.setflags(write=False)
+    _TABLES_CACHE[db_path] = (stamp, tables)
+    return tables
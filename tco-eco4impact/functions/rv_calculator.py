@@ -2,14 +2,303 @@
 Residual Value (RV) Calculator - CoSApp Implementation
 """
 import os
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from operator import attrgetter
+from typing import NamedTuple, Optional
 from cosapp.base import System
-import json
 import math
+from math import expm1
+import numpy as np
 from models.vehicle_port import VehiclePropertiesPort
 from models.country_port import CountryPropertiesPort
+from models.enums import WarrantyType
+from functions.db_cache import load_db
+from functions.db_tables import load_rv_tables, COUNTRY_METRIC_IDX, VEHICLE_METRIC_IDX
+from functions.rv_vectorized import (ENERGY_ICE, ENERGY_ELECTRIC, ENERGY_HYBRID, ENERGY_OTHER,
+                                     depreciation_vec, efficiency_vec, obsolescence_vec, charging_vec,
+                                     warranty_vec, external_factors_vec)
+
+try:
+    from numba import njit
+except ImportError:  # optional dependency
+    njit = None
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Energy families used by the impact health penalties
+ICE_ENERGY_TYPES = frozenset({"DIESEL", "BIO_DIESEL", "HVO", "E_DIESEL", "CNG", "LNG", "H2_ICE"})
+ELECTRIC_ENERGY_TYPES = frozenset({"BEV", "FCEV"})
+HYBRID_ENERGY_TYPES = frozenset({"HEV", "PHEV"})
+# Battery charged at slow / fast / ultra chargers (charging penalty)
+CHARGING_ENERGY_TYPES = frozenset({"BEV"})
+
+_ENERGY_CAT = {
+    **{te: ENERGY_ICE for te in ICE_ENERGY_TYPES},
+    **{te: ENERGY_ELECTRIC for te in ELECTRIC_ENERGY_TYPES},
+    **{te: ENERGY_HYBRID for te in HYBRID_ENERGY_TYPES},
+}
+
+
+def _energy_category(type_energy: str) -> int:
+    # EnergyCategory code of an energy type, resolved once per type (tables / params)
+    return _ENERGY_CAT.get(type_energy, ENERGY_OTHER)
+
+
+@dataclass(slots=True)
+class RVVehicleInputs:
+    '''
+    Snapshot of the VehiclePropertiesPort variables read by compute(): the port
+    is read once per run, then the kernel arguments are slot loads.
+    '''
+    type_energy: str
+    registration_country: str
+    vehicle_number: int
+    purchase_cost: float
+    current_year: int
+    year_purchase: int
+    travel_measure: float
+    maintenance_cost: float
+    minimum_fuel_consumption: float
+    consumption_real: float
+    utility_factor: float
+    powertrain_model_year: int
+    E_annual_kwh: float
+    C_bat_kwh: float
+    DoD: float
+    S_slow: float
+    S_fast: float
+    S_ultra: float
+    warranty: float
+    type_warranty: str
+
+
+# Inputs read by compute(): the key of the results cache
+_VEHICLE_KEY = attrgetter(*(f.name for f in fields(RVVehicleInputs)))
+_COUNTRY_KEY = attrgetter("energy_price", "c02_taxes", "subsidies")
+
+# Outputs restored on a results cache hit
+RV_RESULTS = ("total_depreciation", "efficiency_penalty", "obsolescence_penalty", "charging_penalty",
+              "warranty_penalty", "total_impact_health", "total_external_factors", "rv")
+
+# Numeric vehicle / country columns read by compute_batch()
+BATCH_VEHICLE_COLUMNS = (
+    "vehicle_number", "purchase_cost", "current_year", "year_purchase", "travel_measure",
+    "maintenance_cost", "minimum_fuel_consumption", "consumption_real", "utility_factor",
+    "powertrain_model_year", "E_annual_kwh", "C_bat_kwh", "DoD", "S_slow", "S_fast", "S_ultra",
+    "warranty",
+)
+BATCH_COUNTRY_COLUMNS = ("energy_price", "c02_taxes", "subsidies")
+
+# Depreciation rates (rate_per_year, rate_by_usage, coef_maintenance): adjacent country metrics
+_DEPRECIATION_RATES = slice(COUNTRY_METRIC_IDX["depreciation_rate_per_year"],
+                            COUNTRY_METRIC_IDX["coef_depreciation_maintenance"] + 1)
+
+# Max number of (country, type_energy) parameter bundles kept per calculator
+PARAMS_CACHE_SIZE = 512
+
+# Max number of input sets kept by the results cache (least recently used evicted)
+COMPUTE_CACHE_SIZE = 256
+
+
+class RVParams(NamedTuple):
+    '''Database parameters of one (country, type_energy), resolved once.'''
+    # Country parameters
+    rate_per_year: float
+    rate_by_usage: float
+    coef_maintenance: float
+    yearly_obsolescence_rate: float
+    energy_price_factor: float
+    cO2_taxes_factor: float
+    subsidies_factor: float
+    # Vehicle parameters (None where the database does not define them)
+    heating_value: Optional[float]
+    consumption_benchmark: Optional[float]
+    n_ev: Optional[float]
+    n_ice: Optional[float]
+    d_slow: Optional[float]
+    d_fast: Optional[float]
+    d_ultra: Optional[float]
+    k_d: Optional[float]
+    # Branches of the energy type
+    energy_cat: int
+    is_charging: bool
+
+
+def _jit(func):
+    # Compiled with Numba when it is installed (cached on disk), plain Python otherwise.
+    # nogil: pure float math, so compiled calls let other threads run (thread pools).
+    # No fastmath: missing parameters and unknown warranty types are NaN, which fastmath
+    # (nnan / ninf) would leave undefined
+    return func if njit is None else njit(cache=True, nogil=True)(func)
+
+
+# Scalar RV equations: one kernel per step, composed by _impact_health_kernel and
+# _rv_kernel and called by the compute_* steps (compute_batch: rv_vectorized)
+
+# 1.- DEPRECIATION
+@_jit
+def _depreciation_kernel(number_of_vehicles, purchase_cost, vehicle_age, travel_measure, maintenance_cost,
+                         rate_per_year, rate_by_usage, coef_maintenance):
+    return (purchase_cost - (rate_per_year * vehicle_age + rate_by_usage * travel_measure
+                             + coef_maintenance * maintenance_cost)) * number_of_vehicles
+
+
+# 2.1.- EFICIENCY
+@_jit
+def _efficiency_kernel(energy_cat, minimum_fuel_consumption, heating_value,
+                       consumption_real, consumption_benchmark, utility_factor, n_ev, n_ice):
+    if energy_cat == ENERGY_ICE:
+        # ICE vehicles: η_f = 3600 / (SFC * Q_HV)
+        n_f = 3600 / (minimum_fuel_consumption * heating_value)
+    elif energy_cat == ENERGY_ELECTRIC:
+        # Electric/Fuel Cell: η_sys = consumption_benchmark / consumption_real
+        n_f = consumption_benchmark / consumption_real if consumption_real > 0 else 0.85
+    elif energy_cat == ENERGY_HYBRID:
+        # Hybrid: η_hybrid = 1 / [(α/η_EV) + (1-α)/η_ICE]
+        if utility_factor > 0 and utility_factor < 1:
+            n_f = 1.0 / ((utility_factor / n_ev) + ((1 - utility_factor) / n_ice))
+        else:
+            n_f = n_ice
+    else:
+        n_f = 0.40
+    return (1.0 - n_f) * 100.0
+
+
+# 2.2.- OBSOLESCENCE
+@_jit
+def _obsolescence_kernel(yearly_obsolescence_rate, model_age):
+    # (1 - exp(-rate * age)) * 100, without cancellation for small exponents
+    return -expm1(-yearly_obsolescence_rate * model_age) * 100
+
+
+# 2.3.- CHARGING
+@_jit
+def _charging_kernel(is_charging, E_annual_kwh, C_bat_kwh, DoD, S_slow, S_fast, S_ultra,
+                     d_slow, d_fast, d_ultra, k_d):
+    if not is_charging:
+        return 0.0
+    # Average degradation per cycle, equivalent full cycles per year
+    degradation_per_cycle = S_slow * d_slow + S_fast * d_fast + S_ultra * d_ultra
+    cycles = E_annual_kwh / (C_bat_kwh * DoD) if C_bat_kwh > 0 and DoD > 0 else 0.0
+    # Penalization: 1 - health_charging, health_charging = exp(-k_d * D)
+    return -expm1(-k_d * cycles * degradation_per_cycle) * 100.0
+
+
+# 2.4.- WARRANTY
+@_jit
+def _warranty_kernel(warranty_code, warranty, vehicle_age, travel_measure):
+    # warranty_code: 0 years, 1 km, -1 unknown -> NaN
+    if warranty_code < 0:
+        return math.nan
+    # (1 - DW) * 100 with DW = 1 - elapsed / warranty: the used fraction directly
+    elapsed = vehicle_age if warranty_code == 0 else travel_measure
+    return elapsed / warranty * 100 if warranty > 0 else 100.0
+
+
+# 3.- EXTERNAL FACTORS
+@_jit
+def _external_factors_kernel(number_of_vehicles, energy_price_factor, energy_price, cO2_taxes_factor, c02_taxes,
+                             subsidies_factor, subsidies):
+    return (energy_price_factor * energy_price + c02_taxes * cO2_taxes_factor
+            + subsidies * subsidies_factor) * number_of_vehicles
+
+
+@_jit
+def _impact_health_kernel(number_of_vehicles, vehicle_age, travel_measure,
+                          energy_cat, minimum_fuel_consumption, heating_value,
+                          consumption_real, consumption_benchmark, utility_factor, n_ev, n_ice,
+                          yearly_obsolescence_rate, model_age,
+                          is_charging, E_annual_kwh, C_bat_kwh, DoD, S_slow, S_fast, S_ultra,
+                          d_slow, d_fast, d_ultra, k_d,
+                          warranty_code, warranty):
+    '''
+    The four impact health penalties in one call. Returns (efficiency,
+    obsolescence, charging, warranty penalties, total_impact_health).
+    '''
+    efficiency_penalty = _efficiency_kernel(energy_cat, minimum_fuel_consumption, heating_value,
+                                            consumption_real, consumption_benchmark, utility_factor, n_ev, n_ice)
+    obsolescence_penalty = _obsolescence_kernel(yearly_obsolescence_rate, model_age)
+    charging_penalty = _charging_kernel(is_charging, E_annual_kwh, C_bat_kwh, DoD, S_slow, S_fast, S_ultra,
+                                        d_slow, d_fast, d_ultra, k_d)
+    warranty_penalty = _warranty_kernel(warranty_code, warranty, vehicle_age, travel_measure)
+
+    total_impact_health = (efficiency_penalty + obsolescence_penalty + charging_penalty
+                           + warranty_penalty) * number_of_vehicles
+    return efficiency_penalty, obsolescence_penalty, charging_penalty, warranty_penalty, total_impact_health
+
+
+@_jit
+def _rv_kernel(number_of_vehicles, purchase_cost, vehicle_age, travel_measure, maintenance_cost,
+               rate_per_year, rate_by_usage, coef_maintenance,
+               energy_cat, minimum_fuel_consumption, heating_value,
+               consumption_real, consumption_benchmark, utility_factor, n_ev, n_ice,
+               yearly_obsolescence_rate, model_age,
+               is_charging, E_annual_kwh, C_bat_kwh, DoD, S_slow, S_fast, S_ultra,
+               d_slow, d_fast, d_ultra, k_d,
+               warranty_code, warranty,
+               energy_price_factor, energy_price, cO2_taxes_factor, c02_taxes, subsidies_factor, subsidies):
+    '''
+    Scalar RV equations once the database parameters are resolved. Returns the
+    RV outputs in the order of RV_RESULTS.
+    '''
+    # 1.- DEPRECIATION
+    total_depreciation = _depreciation_kernel(number_of_vehicles, purchase_cost, vehicle_age, travel_measure,
+                                              maintenance_cost, rate_per_year, rate_by_usage, coef_maintenance)
+
+    # 2.- IMPACT HEALTH
+    efficiency_penalty, obsolescence_penalty, charging_penalty, warranty_penalty, total_impact_health = \
+        _impact_health_kernel(number_of_vehicles, vehicle_age, travel_measure,
+                              energy_cat, minimum_fuel_consumption, heating_value,
+                              consumption_real, consumption_benchmark, utility_factor, n_ev, n_ice,
+                              yearly_obsolescence_rate, model_age,
+                              is_charging, E_annual_kwh, C_bat_kwh, DoD, S_slow, S_fast, S_ultra,
+                              d_slow, d_fast, d_ultra, k_d,
+                              warranty_code, warranty)
+
+    # 3.- EXTERNAL FACTORS
+    total_external_factors = _external_factors_kernel(number_of_vehicles, energy_price_factor, energy_price,
+                                                      cO2_taxes_factor, c02_taxes, subsidies_factor, subsidies)
+
+    # 4.- RV
+    rv = total_depreciation + total_impact_health + total_external_factors
+    return (total_depreciation, efficiency_penalty, obsolescence_penalty, charging_penalty,
+            warranty_penalty, total_impact_health, total_external_factors, rv)
+
+
+# Argument types of _rv_kernel, in order (f8: float, i8: int code, b1: flag)
+RV_KERNEL_ARG_TYPES = (
+    ["f8"] * 8                   # number_of_vehicles ... coef_maintenance
+    + ["i8"]                     # energy_cat
+    + ["f8"] * 9                 # minimum_fuel_consumption ... model_age
+    + ["b1"]                     # is_charging
+    + ["f8"] * 10                # E_annual_kwh ... k_d
+    + ["i8"]                     # warranty_code
+    + ["f8"] * 7                 # warranty, external factors and country inputs
+)
+RV_KERNEL_SIGNATURE = f"UniTuple(f8, 8)({', '.join(RV_KERNEL_ARG_TYPES)})"
+
+# Ahead-of-time compiled kernel (tools/build_rv_kernel.py) when it has been built:
+# no Numba needed at runtime and no JIT warm-up. Otherwise the jitted kernel is
+# compiled (or loaded from the disk cache) on its first call, not at import
+try:
+    from functions._rv_kernel_aot import rv_compute
+except ImportError:  # not built
+    rv_compute = _rv_kernel
+
+
+def _nan(value) -> float:
+    # Kernel argument for a parameter the database may not define
+    return math.nan if value is None else value
+
+
+@lru_cache(maxsize=None)
+def _warranty_code(type_warranty) -> int:
+    # WarrantyType value, -1 when the warranty type is unknown
+    warranty_type = WarrantyType.parse(type_warranty)
+    return -1 if warranty_type is None else int(warranty_type)
+
 class ResidualValueCalculator(System):
     '''
     Residual Value (RV) Calculator System
@@ -32,18 +321,22 @@ class ResidualValueCalculator(System):
             else:
                 db_path = os.path.join(db_folder, "db_trucks.json")
         
-        # Load database
-        with open(db_path, 'r') as f:
-            db_rv = json.load(f)
-
-        object.__setattr__(self, '_countries_data',
-                           {c['country']: c['data_country'] for c in db_rv['countries']})
-        
-        object.__setattr__(self, '_vehicles_data',db_rv['vehicle'])
+        # Database: dense tables (prebuilt .npz when available) loaded on first use,
+        # the JSON is only parsed when the tables must be built or for _countries_data
+        object.__setattr__(self, '_db_path', db_path)
+        object.__setattr__(self, '_rv_tables', None)
+        object.__setattr__(self, '_countries_index', None)
+        object.__setattr__(self, '_db_params', lru_cache(maxsize=PARAMS_CACHE_SIZE)(self._lookup_params))
+        object.__setattr__(self, '_last_key', None)
+        object.__setattr__(self, '_last_params', None)
+        object.__setattr__(self, '_compute_cache', OrderedDict())
         
         # # Add ports
         self.add_input(VehiclePropertiesPort, 'in_vehicle_properties')
         self.add_input(CountryPropertiesPort, 'in_country_properties')
+        # Port objects bound once: compute() reads them without the System attribute lookup
+        object.__setattr__(self, '_vehicle_port', self.in_vehicle_properties)
+        object.__setattr__(self, '_country_port', self.in_country_properties)
 
         # Add output variables
         self.add_outward('total_depreciation', 0.0, desc='Total depreciation cost')
@@ -56,202 +349,408 @@ class ResidualValueCalculator(System):
         self.add_outward('rv', 0.0, desc='Final Residual Value')
 
 
-    # COMPUTE METHODS FOR RV CALCULATION
-
-    # 1.- DEPRECIATION
-    def compute_depreciation(self):
+    # INPUT VALIDATION (once per run, outside compute)
+    def _validate_inputs(self, vp=None):
         '''
-        Formula:        
-        :param self: Description
+        Check that the vehicle can be evaluated with the loaded database.
+        Raises ValueError up front instead of failing inside compute().
         '''
-        # Inputs
-        vp = self.in_vehicle_properties
-        type_energy = vp.type_energy
+        if vp is None:
+            vp = self._vehicle_port
         country = vp.registration_country
-        number_of_vehicles = vp.vehicle_number
 
-        # Parameters of database
-        rate_per_year = self._countries_data[country]["depreciation"]["depreciation_rate_per_year"][type_energy]
-        rate_by_usage = self._countries_data[country]["depreciation"]["depreciation_rate_by_usage"][type_energy]
-        coef_maintenance = self._countries_data[country]["depreciation"]["coef_depreciation_maintenance"][type_energy]
+        tables = self.get_rv_tables()
+        ci = self._country_idx.get(country)
+        if ci is None:
+            raise ValueError(f"Country '{country}' not found in database")
+        ei = self._energy_idx.get(vp.type_energy)
+        if ei is None or np.isnan(tables['country_params'][ci, ei, COUNTRY_METRIC_IDX["depreciation_rate_per_year"]]):
+            raise ValueError(f"Energy type '{vp.type_energy}' not found for country '{country}'")
+        if vp.current_year < vp.year_purchase:
+            raise ValueError(f"current_year ({vp.current_year}) is before year_purchase ({vp.year_purchase})")
+        if _warranty_code(vp.type_warranty) < 0:
+            raise ValueError(f"type_warranty '{vp.type_warranty}' only can be year(s) or km")
+
+    @property
+    def _countries_data(self) -> dict:
+        '''{country: data_country} of the JSON database (parsed on first access, shared).'''
+        db = load_db(self._db_path)
+        # Index built once per loaded database, not on every access
+        if self._countries_index is None or self._countries_index[0] is not db:
+            countries = {c['country']: c['data_country'] for c in db['countries']}
+            object.__setattr__(self, '_countries_index', (db, countries))
+        return self._countries_index[1]
+
+    @property
+    def _vehicles_data(self) -> dict:
+        return load_db(self._db_path)['vehicle']
+
+    def get_rv_tables(self) -> dict:
+        '''Dense NumPy tables of the database parameters (loaded on first use, shared).'''
+        if self._rv_tables is None:
+            tables = load_rv_tables(self._db_path)
+            # Integer codes of the table axes
+            object.__setattr__(self, '_country_idx', {str(c): i for i, c in enumerate(tables['countries'])})
+            object.__setattr__(self, '_energy_idx', {str(te): i for i, te in enumerate(tables['energy_types'])})
+            # Energy families by energy code
+            energy_types = tables['energy_types']
+            object.__setattr__(self, '_is_charging', np.isin(energy_types, list(CHARGING_ENERGY_TYPES)))
+            object.__setattr__(self, '_energy_cat', np.array([_energy_category(str(te)) for te in energy_types],
+                                                             dtype=np.uint8))
+            object.__setattr__(self, '_rv_tables', tables)
+        return self._rv_tables
+
+    def _get_params(self, vp=None) -> RVParams:
+        '''Database parameters of the vehicle, cached by (country, type_energy).'''
+        if vp is None:
+            vp = self._vehicle_port
+        key = (vp.registration_country, vp.type_energy)
+        # Sweeps that only vary numeric inputs keep the same key: no hashing
+        if key == self._last_key:
+            return self._last_params
+        params = self._db_params(*key)
+        object.__setattr__(self, '_last_key', key)
+        object.__setattr__(self, '_last_params', params)
+        return params
+
+    def _lookup_params(self, country: str, type_energy: str) -> RVParams:
+        '''
+        RVParams of (country, type_energy): one row of the dense tables, unboxed to
+        Python floats (NaN -> None). Pure lookup, memoized per instance as _db_params.
+        '''
+        tables = self.get_rv_tables()
+        ci = self._country_idx[country]
+        ei = self._energy_idx[type_energy]
+        country_row = tables['country_params'][ci, ei]
+        vehicle_row = tables['vehicle_params'][ei]
+
+        def country_param(name):
+            value = float(country_row[COUNTRY_METRIC_IDX[name]])
+            if math.isnan(value):
+                raise KeyError(f"'{name}' not defined for '{type_energy}' in '{country}'")
+            return value
+
+        def vehicle_param(name):
+            value = float(vehicle_row[VEHICLE_METRIC_IDX[name]])
+            return None if math.isnan(value) else value
+
+        return RVParams(
+            rate_per_year=country_param("depreciation_rate_per_year"),
+            rate_by_usage=country_param("depreciation_rate_by_usage"),
+            coef_maintenance=country_param("coef_depreciation_maintenance"),
+            yearly_obsolescence_rate=country_param("yearly_obsolescence_rate"),
+            energy_price_factor=country_param("energy_price_factor"),
+            cO2_taxes_factor=country_param("CO2_taxes_factor"),
+            subsidies_factor=country_param("subsidies_factor"),
+            heating_value=vehicle_param("heating_value"),
+            consumption_benchmark=vehicle_param("consumption_benchmark"),
+            n_ev=vehicle_param("n_ev"),
+            n_ice=vehicle_param("n_ice"),
+            d_slow=vehicle_param("d_slow"),
+            d_fast=vehicle_param("d_fast"),
+            d_ultra=vehicle_param("d_ultra"),
+            k_d=vehicle_param("k_d"),
+            energy_cat=_energy_category(type_energy),
+            is_charging=type_energy in CHARGING_ENERGY_TYPES,
+        )
+
+    def setup_run(self):
+        # Called by the drivers before running: validate once per run
+        self._validate_inputs()
 
-        # Depreciation components
-        purchase_cost = vp.purchase_cost
-        vehicle_age = vp.current_year - vp.year_purchase
-        dep_per_year = rate_per_year * vehicle_age
-        dep_by_usage = rate_by_usage * vp.travel_measure
-        dep_maintenance = coef_maintenance * vp.maintenance_cost
+    # COMPUTE METHODS FOR RV CALCULATION
+    # Each step evaluates its kernel (same equations as compute()) and writes its output
 
-        # Total depreciation
-        self.total_depreciation = purchase_cost - (dep_per_year + dep_by_usage + dep_maintenance)
-        self.total_depreciation = self.total_depreciation*number_of_vehicles
+    # 1.- DEPRECIATION
+    def compute_depreciation(self, vp=None):
+        '''
+        Formula:        
+        :param vp: vehicle inputs already read by the caller (in_vehicle_properties if None),
+                   same for every compute_* step
+        '''
+        if vp is None:
+            vp = self._vehicle_port
+        p = self._get_params(vp)
+        self.total_depreciation = total_depreciation = _depreciation_kernel(
+            vp.vehicle_number, vp.purchase_cost, vp.current_year - vp.year_purchase, vp.travel_measure,
+            vp.maintenance_cost, p.rate_per_year, p.rate_by_usage, p.coef_maintenance)
+        return total_depreciation
 
     # 2.1.- PENALIZATION OF EFICIENCY
-    def compute_eficiency(self):
-        # Inputs
-        vp = self.in_vehicle_properties
-        type_energy = vp.type_energy
-        
-
-        # Depends of the type of energy:
-        if type_energy in ["DIESEL", "BIO_DIESEL", "HVO" ,"E_DIESEL", "CNG", "LNG", "H2_ICE"]:
-            minimum_fuel_consumption = vp.minimum_fuel_consumption
-            heating_value = self._vehicles_data["heating_value"][type_energy]
-            # ICE vehicles: η_f = 360S0 / (SFC * Q_HV)
-            n_f = 3600/(minimum_fuel_consumption * heating_value)
-        
-        elif type_energy in ["BEV", "FCEV"]:
-            # Electric/Fuel Cell: η_sys = consumption_benchmark / consumption_real
-            consumption_real = vp.consumption_real
-            consumption_benchmark = self._vehicles_data["consumption_benchmark"][type_energy]
+    def compute_eficiency(self, vp=None):
+        if vp is None:
+            vp = self._vehicle_port
+        p = self._get_params(vp)
+        self.efficiency_penalty = efficiency_penalty = _efficiency_kernel(
+            p.energy_cat, vp.minimum_fuel_consumption, _nan(p.heating_value),
+            vp.consumption_real, _nan(p.consumption_benchmark), vp.utility_factor, _nan(p.n_ev), _nan(p.n_ice))
+        return efficiency_penalty
 
-            if consumption_real>0:
-                n_f = consumption_benchmark / consumption_real
-            else:
-                n_f = 0.85
-        
-        elif type_energy in ["HEV", "PHEV"]:
-            # Hybrid: η_hybrid = 1 / [(α/η_EV) + (1-α)/η_ICE]
-            utility_factor = vp.utility_factor
-            n_ev = self._vehicles_data["n_ev"][type_energy]
-            n_ice = self._vehicles_data["n_ice"][type_energy]
-
-            if utility_factor>0 and utility_factor <1:
-                n_f = 1.0/((utility_factor/n_ev)+((1-utility_factor)/n_ice))
-            else:
-                n_f = n_ice
-        else:
-            n_f = 0.40 # Default
-        
-        self.efficiency_penalty = (1.0 - n_f)*100.0
-        
     # 2.2.- OBSOLESCENCE
-    def compute_obsolescence(self):
-        # Inputs
-        vp = self.in_vehicle_properties
-        type_energy = vp.type_energy
-        country = vp.registration_country
-        powertrain_model_year = vp.powertrain_model_year
-
-        # Parameters of database
-        yearly_obsolescence_rate = self._countries_data[country]["yearly_obsolescence_rate"][type_energy]
-
-        # Output
-        DM = math.exp(-yearly_obsolescence_rate * (vp.current_year - powertrain_model_year) )
-        
-        self.obsolescence_penalty = (1.0-DM)*100
+    def compute_obsolescence(self, vp=None):
+        if vp is None:
+            vp = self._vehicle_port
+        self.obsolescence_penalty = obsolescence_penalty = _obsolescence_kernel(
+            self._get_params(vp).yearly_obsolescence_rate, vp.current_year - vp.powertrain_model_year)
+        return obsolescence_penalty
 
     # 2.3.- CHARGING
-    def compute_charging(self):
-        # Inputs
-        vp = self.in_vehicle_properties
-        type_energy = vp.type_energy
-
-        if type_energy == "electric":
-            E_annual_kwh = vp.E_annual_kwh
-            C_bat_kwh = vp.C_bat_kwh
-            DoD = vp.DoD
-            S_slow = vp.S_slow
-            S_fast = vp.S_fast
-            S_ultra = vp.S_ultra
-
-            # Parameters of database
-            d_slow = self._vehicles_data["d_slow"][type_energy]
-            d_fast = self._vehicles_data["d_fast"][type_energy]
-            d_ultra = self._vehicles_data["d_ultra"][type_energy]
-            k_d = self._vehicles_data["k_d"][type_energy]
-        
-            # Average degradation per cycle
-            degradation_per_cycle = (S_slow * d_slow + 
-                                   S_fast * d_fast + 
-                                   S_ultra * d_ultra)
-            
-            # Equivalent full cycles per year
-            if C_bat_kwh > 0 and DoD > 0:
-                cycles = E_annual_kwh / (C_bat_kwh * DoD)
-            else:
-                cycles = 0.0
-            
-            # Total annual degradation
-            D = cycles * degradation_per_cycle
-            
-            # Charging health factor (exponential decay)
-            health_charging = math.exp(-k_d * D)
-            
-            # Penalization: charging = 1 - health_charging
-            self.charging_penalty = (1.0 - health_charging) * 100.0
-        else:
-            self.charging_penalty = 0.0
+    def compute_charging(self, vp=None):
+        if vp is None:
+            vp = self._vehicle_port
+        p = self._get_params(vp)
+        self.charging_penalty = charging_penalty = _charging_kernel(
+            p.is_charging, vp.E_annual_kwh, vp.C_bat_kwh, vp.DoD, vp.S_slow, vp.S_fast, vp.S_ultra,
+            _nan(p.d_slow), _nan(p.d_fast), _nan(p.d_ultra), _nan(p.k_d))
+        return charging_penalty
 
     # 2.4.- COMPUTE WARRANTY
-    def compute_warranty(self):
-        # Inputs
-        vp = self.in_vehicle_properties
-        warranty = vp.warranty
-        type_warranty = vp.type_warranty
-        year_purchase = vp.year_purchase
-        DW = 0.0
-
-        if type_warranty=="year":
-            elapsed = vp.current_year - year_purchase
-
-            if warranty>0:
-                DW = 1.0 - (elapsed/warranty)
-            else:
-                DW= 0.0
-        elif type_warranty=="km":
-            elapsed = vp.travel_measure
-
-            if warranty>0:
-                DW = 1.0 - (elapsed/warranty)
-            else:
-                DW = 0.0
-        else:
-            print("Obs.: type_warranty only can be year or km")
-
-        # Penalization
-        self.warranty_penalty = (1.0-DW)*100
-
+    def compute_warranty(self, vp=None):
+        # 'year' and 'years' are the same unit; unknown type_warranty: NaN sentinel
+        if vp is None:
+            vp = self._vehicle_port
+        self.warranty_penalty = warranty_penalty = _warranty_kernel(
+            _warranty_code(vp.type_warranty), vp.warranty, vp.current_year - vp.year_purchase, vp.travel_measure)
+        return warranty_penalty
 
     # 2.- IMPACT HEALTH
-    def compute_impact_health(self):
-        self.compute_eficiency()
-        self.compute_obsolescence()
-        self.compute_charging()
-        self.compute_warranty()
-        vp = self.in_vehicle_properties
-        number_of_vehicles = vp.vehicle_number
-        
-        # Compute IMPACT HEALTH
-        self.total_impact_health = (self.efficiency_penalty+self.obsolescence_penalty+self.charging_penalty+self.warranty_penalty)
-        self.total_impact_health = self.total_impact_health*number_of_vehicles
+    def _impact_health_args(self, vp, p) -> tuple:
+        '''Arguments of _impact_health_kernel: each port input read once.'''
+        # Ages shared by depreciation, obsolescence and warranty, computed once
+        current_year = vp.current_year
+        vehicle_age = current_year - vp.year_purchase
+        model_age = current_year - vp.powertrain_model_year
+        warranty_code = _warranty_code(vp.type_warranty)
+        return (vp.vehicle_number, vehicle_age, vp.travel_measure,
+                p.energy_cat, vp.minimum_fuel_consumption, _nan(p.heating_value),
+                vp.consumption_real, _nan(p.consumption_benchmark), vp.utility_factor, _nan(p.n_ev), _nan(p.n_ice),
+                p.yearly_obsolescence_rate, model_age,
+                p.is_charging, vp.E_annual_kwh, vp.C_bat_kwh, vp.DoD, vp.S_slow, vp.S_fast, vp.S_ultra,
+                _nan(p.d_slow), _nan(p.d_fast), _nan(p.d_ultra), _nan(p.k_d),
+                warranty_code, vp.warranty)
+
+    def compute_impact_health(self, vp=None):
+        # Eficiency, obsolescence, charging and warranty fused (see compute_* for each one)
+        if vp is None:
+            vp = self._vehicle_port
+        (self.efficiency_penalty, self.obsolescence_penalty, self.charging_penalty,
+         self.warranty_penalty, total_impact_health) = _impact_health_kernel(
+            *self._impact_health_args(vp, self._get_params(vp)))
+        self.total_impact_health = total_impact_health
+        return total_impact_health
 
     # 3.- EXTERNAL FACTORS
-    def compute_external_factors(self):
-        # Inputs
-        cp = self.in_country_properties
-        vp = self.in_vehicle_properties
-        energy_price = cp.energy_price
-        c02_taxes = cp.c02_taxes
-        subsidies = cp.subsidies
-        type_energy = vp.type_energy
-        country = vp.registration_country
-        number_of_vehicles = vp.vehicle_number
+    def compute_external_factors(self, vp=None):
+        cp = self._country_port
+        if vp is None:
+            vp = self._vehicle_port
+        p = self._get_params(vp)
+        self.total_external_factors = total_external_factors = _external_factors_kernel(
+            vp.vehicle_number, p.energy_price_factor, cp.energy_price, p.cO2_taxes_factor, cp.c02_taxes,
+            p.subsidies_factor, cp.subsidies)
+        return total_external_factors
 
+    # 4.- RV
+    def snapshot_inputs(self) -> RVVehicleInputs:
+        '''
+        Copy of the vehicle port values read by the RV (one port read each).
+        Pass it as vp to the compute_* steps to run several of them without
+        going back through the port.
+        '''
+        return RVVehicleInputs(*_VEHICLE_KEY(self._vehicle_port))
 
-        # Parameters of database
-        energy_price_factor = self._countries_data[country]["external_factors"]["energy_price_factor"][type_energy]
-        cO2_taxes_factor = self._countries_data[country]["external_factors"]["CO2_taxes_factor"]
-        subsidies_factor = self._countries_data[country]["external_factors"]["subsidies_factor"][type_energy]
+    def _write_results(self, results: tuple):
+        # All the RV outputs in one unpacking (order of RV_RESULTS), no re-reads
+        (self.total_depreciation, self.efficiency_penalty, self.obsolescence_penalty, self.charging_penalty,
+         self.warranty_penalty, self.total_impact_health, self.total_external_factors, self.rv) = results
 
-        # Total external_factors
-        self.total_external_factors = energy_price_factor*energy_price+ c02_taxes*cO2_taxes_factor + subsidies*subsidies_factor
-        self.total_external_factors = self.total_external_factors*number_of_vehicles
+    def evaluate(self, vp, energy_price: float, c02_taxes: float, subsidies: float) -> tuple:
+        '''
+        RV outputs (order of RV_RESULTS) of one vehicle, without reading or writing
+        any port: database parameters (cached) + compiled kernel. Inputs are not
+        validated (see _validate_inputs).
+
+        :param vp: RVVehicleInputs (or any object with the same attributes)
+        '''
+        return rv_compute(*self._kernel_args(vp, energy_price, c02_taxes, subsidies))
+
+    def _kernel_args(self, vp, energy_price: float, c02_taxes: float, subsidies: float) -> tuple:
+        '''Arguments of _rv_kernel for one vehicle (order of RV_KERNEL_ARG_TYPES).'''
+        p = self._get_params(vp)
+        (number_of_vehicles, vehicle_age, travel_measure, *health_args) = self._impact_health_args(vp, p)
+        return (number_of_vehicles, vp.purchase_cost, vehicle_age, travel_measure, vp.maintenance_cost,
+                p.rate_per_year, p.rate_by_usage, p.coef_maintenance,
+                *health_args,
+                p.energy_price_factor, energy_price, p.cO2_taxes_factor, c02_taxes, p.subsidies_factor, subsidies)
 
-    # 4.- RV
     def compute(self):
-        self.compute_depreciation()
-        self.compute_impact_health()
-        self.compute_external_factors()
+        # Same inputs as a recent run (driver sweeps): restore its outputs
+        vehicle_values = _VEHICLE_KEY(self._vehicle_port)
+        country_values = _COUNTRY_KEY(self._country_port)
+        key = vehicle_values + country_values
+        cache = self._compute_cache
+        results = cache.get(key)
+        if results is not None:
+            cache.move_to_end(key)
+            self._write_results(results)
+            return
+
+        results = self.evaluate(RVVehicleInputs(*vehicle_values), *country_values)
+        self._write_results(results)
+
+        cache[key] = results
+        if len(cache) > COMPUTE_CACHE_SIZE:
+            cache.popitem(last=False)
+
+    # 5.- FLEET RV (VECTORIZED)
+    def compute_fleet(self, vps: list, cps: list = None) -> dict:
+        '''
+        Vectorized RV over a fleet of vehicles.
+
+        Same equations as compute(), evaluated with NumPy arrays (one entry per
+        vehicle) instead of one CoSApp run per vehicle.
 
-        self.rv = (self.total_depreciation+self.total_impact_health+self.total_external_factors)
+        :param vps: vehicle properties (VehiclePropertiesPort or any object with the same attributes)
+        :param cps: country properties, one per vehicle. If None, in_country_properties is used for all
+        :return: dict of arrays keyed by the names of the RV outputs
+        '''
+        vehicles = {name: [getattr(vp, name) for vp in vps]
+                    for name in BATCH_VEHICLE_COLUMNS + ('registration_country', 'type_energy', 'type_warranty')}
+        countries = None
+        if cps is not None:
+            countries = {name: [getattr(cp, name) for cp in cps] for name in BATCH_COUNTRY_COLUMNS}
+        return self.compute_batch(vehicles, countries)
+
+    def rv_codes(self, registration_country, type_energy, type_warranty=None) -> tuple:
+        '''
+        Integer codes (country_idx, energy_idx, warranty_type) of name arrays, for compute_batch.
+        Raises ValueError for names not in the database.
+        '''
+        self.get_rv_tables()
+        codes = [_codes(self._country_idx, registration_country, "Country"),
+                 _codes(self._energy_idx, type_energy, "Energy type")]
+        if type_warranty is not None:
+            codes.append(np.array([_warranty_code(tw) for tw in type_warranty], dtype=np.intp))
+        return tuple(codes)
+
+    def compute_batch(self, vehicles, countries=None, dtype: type = float) -> dict:
+        '''
+        Vectorized RV over column arrays of inputs (one entry per vehicle).
+
+        :param vehicles: mapping column -> 1-D array (dict of arrays, DataFrame, ...) with the
+            BATCH_VEHICLE_COLUMNS, plus country / energy / warranty type either as names
+            ('registration_country', 'type_energy', 'type_warranty') or as integer codes
+            ('country_idx', 'energy_idx', 'warranty_type', see rv_codes())
+        :param countries: mapping with the BATCH_COUNTRY_COLUMNS (arrays or scalars).
+            If None, in_country_properties is used for all vehicles
+        :param dtype: storage precision of the input columns and parameters. SWEEP_DTYPE
+            (float32) halves the memory and bandwidth of large sweeps (error below
+            1e-5 of the output scale); keep the default float for exact euro totals
+        :return: dict of arrays keyed by the names of the RV outputs
+        '''
+        tables = self.get_rv_tables()
+        dtype = np.dtype(dtype).type
+
+        if 'country_idx' in vehicles:
+            ci = np.asarray(vehicles['country_idx'], dtype=np.intp)
+            ei = np.asarray(vehicles['energy_idx'], dtype=np.intp)
+            warranty_type = np.asarray(vehicles['warranty_type'], dtype=np.intp)
+        else:
+            ci, ei, warranty_type = self.rv_codes(vehicles['registration_country'],
+                                                  vehicles['type_energy'], vehicles['type_warranty'])
+
+        def column(name):
+            return np.asarray(vehicles[name], dtype=dtype)
+
+        number_of_vehicles = column('vehicle_number')
+        purchase_cost = column('purchase_cost')
+        travel_measure = column('travel_measure')
+        current_year = column('current_year')
+        year_purchase = column('year_purchase')
+        warranty = column('warranty')
+        # Ages used by several steps, computed once
+        vehicle_age = current_year - year_purchase
+        model_age = current_year - column('powertrain_model_year')
+
+        # Parameters of database (dense tables indexed by country and energy)
+        country_params = tables['country_params'][ci, ei]
+        vehicle_params = tables['vehicle_params'][ei]
+
+        # Validation (same checks as _validate_inputs, for the whole batch)
+        missing = np.isnan(country_params[:, COUNTRY_METRIC_IDX["depreciation_rate_per_year"]])
+        if missing.any():
+            i = int(np.argmax(missing))
+            raise ValueError(f"Energy type '{tables['energy_types'][ei[i]]}' not found for country "
+                             f"'{tables['countries'][ci[i]]}'")
+        early = vehicle_age < 0
+        if early.any():
+            i = int(np.argmax(early))
+            raise ValueError(f"current_year ({current_year[i]:g}) is before year_purchase ({year_purchase[i]:g})")
+        if (warranty_type < 0).any():
+            raise ValueError("type_warranty only can be year(s) or km")
+
+        country_params = country_params.astype(dtype, copy=False)
+        vehicle_params = vehicle_params.astype(dtype, copy=False)
+
+        def country_param(name):
+            return country_params[:, COUNTRY_METRIC_IDX[name]]
+
+        def vehicle_param(name):
+            return vehicle_params[:, VEHICLE_METRIC_IDX[name]]
+
+        # 1.- DEPRECIATION
+        usage = np.column_stack((vehicle_age, travel_measure, column('maintenance_cost')))
+        rates = country_params[:, _DEPRECIATION_RATES]
+        if len(rates) and (ci == ci[0]).all() and (ei == ei[0]).all():
+            # Single (country, energy) fleet: one set of rates for every vehicle
+            rates = rates[0]
+        total_depreciation = depreciation_vec(purchase_cost, usage, rates, number_of_vehicles)
+
+        # 2.- IMPACT HEALTH
+        efficiency_penalty = efficiency_vec(
+            self._energy_cat[ei], column('minimum_fuel_consumption'), vehicle_param("heating_value"),
+            column('consumption_real'), vehicle_param("consumption_benchmark"), column('utility_factor'),
+            vehicle_param("n_ev"), vehicle_param("n_ice"))
+        obsolescence_penalty = obsolescence_vec(country_param("yearly_obsolescence_rate"), model_age)
+        charging_penalty = charging_vec(
+            self._is_charging[ei], column('E_annual_kwh'), column('C_bat_kwh'), column('DoD'),
+            column('S_slow'), column('S_fast'), column('S_ultra'),
+            vehicle_param("d_slow"), vehicle_param("d_fast"), vehicle_param("d_ultra"), vehicle_param("k_d"))
+        warranty_penalty = warranty_vec(warranty_type, warranty, vehicle_age, travel_measure)
+        total_impact_health = (efficiency_penalty + obsolescence_penalty + charging_penalty + warranty_penalty) * number_of_vehicles
+
+        # 3.- EXTERNAL FACTORS
+        energy_price, c02_taxes, subsidies = self._country_columns(countries, dtype)
+        total_external_factors = external_factors_vec(
+            country_param("energy_price_factor"), energy_price, country_param("CO2_taxes_factor"), c02_taxes,
+            country_param("subsidies_factor"), subsidies, number_of_vehicles)
+
+        # 4.- RV
+        rv = total_depreciation + total_impact_health + total_external_factors
+
+        return {
+            'total_depreciation': total_depreciation,
+            'efficiency_penalty': efficiency_penalty,
+            'obsolescence_penalty': obsolescence_penalty,
+            'charging_penalty': charging_penalty,
+            'warranty_penalty': warranty_penalty,
+            'total_impact_health': total_impact_health,
+            'total_external_factors': total_external_factors,
+            'rv': rv,
+        }
+
+
+    def _country_columns(self, countries, dtype: type = float) -> tuple:
+        # (energy_price, c02_taxes, subsidies): arrays, or scalars of in_country_properties
+        if countries is None:
+            cp = self._country_port
+            return tuple(getattr(cp, name) for name in BATCH_COUNTRY_COLUMNS)
+        return tuple(np.asarray(countries[name], dtype=dtype) for name in BATCH_COUNTRY_COLUMNS)
+
+
+def _codes(index: dict, names, what: str) -> np.ndarray:
+    # Integer codes of names; ValueError for names not in the database
+    try:
+        return np.array([index[name] for name in names], dtype=np.intp)
+    except KeyError as err:
+        raise ValueError(f"{what} {err} not found in database") from None
@@ -0,0 +1,72 @@
+"""
+Lightweight RV entry point for sweeps and scripts (no CoSApp ports or drivers).
+
+compute_rv() evaluates the same equations as ResidualValueCalculator.compute()
+from plain slotted dataclasses: one calculator per database is built once and
+only used for its parameter tables / caches, so each call is a parameter lookup
+plus one kernel call instead of port assignments and a driver run.
+"""
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from typing import Mapping, NamedTuple, Optional
+
+from functions.rv_calculator import ResidualValueCalculator, RVVehicleInputs, _VEHICLE_KEY
+from models.enums import AssetType
+
+
+@dataclass(slots=True)
+class RVCountryInputs:
+    '''Country inputs of the RV (same variables as CountryPropertiesPort).'''
+    energy_price: float = 0.0
+    c02_taxes: float = 0.0
+    subsidies: float = 0.0
+
+
+class RVOutputs(NamedTuple):
+    '''RV outputs, same names as the ResidualValueCalculator outputs.'''
+    total_depreciation: float
+    efficiency_penalty: float
+    obsolescence_penalty: float
+    charging_penalty: float
+    warranty_penalty: float
+    total_impact_health: float
+    total_external_factors: float
+    rv: float
+
+
+@lru_cache(maxsize=None)
+def _calculator(is_ship: bool, db_path: Optional[str]) -> ResidualValueCalculator:
+    # Parameter provider of a database, built once per process
+    return ResidualValueCalculator("rv_fast", type_vehicle="ship" if is_ship else "trucks", db_path=db_path)
+
+
+def rv_vehicle_inputs(rv_inputs: Mapping) -> RVVehicleInputs:
+    '''
+    RVVehicleInputs from an "rv" input section (see inputs.gen_inputs): missing
+    fields take the VehiclePropertiesPort defaults, extra keys are ignored.
+    '''
+    values = dict(zip((f.name for f in fields(RVVehicleInputs)),
+                      _VEHICLE_KEY(_calculator(False, None).in_vehicle_properties)))
+    values.update((name, rv_inputs[name]) for name in values.keys() & rv_inputs.keys())
+    return RVVehicleInputs(**values)
+
+
+def rv_country_inputs(rv_inputs: Mapping) -> RVCountryInputs:
+    '''RVCountryInputs from an "rv" input section (co2_taxes -> c02_taxes).'''
+    return RVCountryInputs(energy_price=rv_inputs.get("energy_price", 0.0),
+                           c02_taxes=rv_inputs.get("co2_taxes", 0.0),
+                           subsidies=rv_inputs.get("subsidies", 0.0))
+
+
+def compute_rv(vehicle: RVVehicleInputs, country: RVCountryInputs, type_vehicle: str = "truck",
+               db_path: Optional[str] = None, validate: bool = True) -> RVOutputs:
+    '''
+    RV of one vehicle, same results as ResidualValueCalculator.compute().
+
+    :param type_vehicle: selects the default database (trucks / ships) when db_path is None
+    :param validate: check the inputs against the database first (ValueError if invalid)
+    '''
+    calculator = _calculator(AssetType.parse(type_vehicle) is AssetType.SHIP, db_path)
+    if validate:
+        calculator._validate_inputs(vehicle)
+    return RVOutputs(*calculator.evaluate(vehicle, country.energy_price, country.c02_taxes, country.subsidies))
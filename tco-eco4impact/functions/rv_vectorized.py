@@ -0,0 +1,109 @@
+"""
+Residual Value (RV) equations on NumPy arrays (one entry per vehicle).
+
+Same equations as the scalar steps of ResidualValueCalculator, written as
+array expressions over Structure-of-Arrays inputs: every branch is evaluated
+for all rows and blended with masks, so a whole fleet costs a handful of
+NumPy calls. The energy type enters as a small integer category
+(energy_category), never as strings. Apart from depreciation_vec, the inputs
+only need to broadcast against each other (parameter grids, scalars).
+
+The functions keep the precision of their array inputs: float32 columns give
+float32 results (Python scalar constants do not upcast them).
+"""
+import numpy as np
+
+from models.enums import EnergyCategory, WarrantyType
+
+# EnergyCategory codes as plain ints (also read as constants by the compiled kernels)
+ENERGY_ICE = int(EnergyCategory.ICE)
+ENERGY_ELECTRIC = int(EnergyCategory.ELECTRIC)
+ENERGY_HYBRID = int(EnergyCategory.HYBRID)
+ENERGY_OTHER = int(EnergyCategory.OTHER)
+
+# Storage precision for large fleet sweeps / Monte Carlo (half the bytes of float64)
+SWEEP_DTYPE = np.float32
+
+
+# 1.- DEPRECIATION
+def depreciation_vec(purchase_cost, usage, rates, number_of_vehicles):
+    '''
+    Total depreciation: (purchase_cost - usage . rates) * number_of_vehicles.
+
+    :param usage: (n, 3) columns vehicle_age, travel_measure, maintenance_cost
+    :param rates: (n, 3) rate_per_year, rate_by_usage, coef_maintenance of each row,
+                  or (3,) when the whole fleet shares them (one matrix-vector product)
+    '''
+    if rates.ndim == 1:
+        depreciation = usage @ rates
+    else:
+        depreciation = np.einsum('ij,ij->i', usage, rates)
+    return (purchase_cost - depreciation) * number_of_vehicles
+
+
+# 2.1.- EFICIENCY
+def _ice_efficiency(minimum_fuel_consumption, heating_value):
+    # ICE vehicles: η_f = 3600 / (SFC * Q_HV)
+    return 3600 / (minimum_fuel_consumption * heating_value)
+
+
+def ice_efficiency_penalty_vec(minimum_fuel_consumption, heating_value, fuel_mask=True):
+    '''
+    Efficiency penalty (%) of the ICE branch alone, 0 where fuel_mask is False.
+    A grid of SFC x heating values is one call:
+    ice_efficiency_penalty_vec(sfc[:, None], heating_values[None, :]).
+    '''
+    with np.errstate(divide='ignore', invalid='ignore'):
+        penalty = (1.0 - _ice_efficiency(minimum_fuel_consumption, heating_value)) * 100.0
+    return np.where(fuel_mask, penalty, 0.0)
+
+
+def efficiency_vec(energy_cat, minimum_fuel_consumption, heating_value,
+                   consumption_real, consumption_benchmark, utility_factor, n_ev, n_ice):
+    '''Efficiency penalty (%); the branch of each row is selected by energy_cat.'''
+    with np.errstate(divide='ignore', invalid='ignore'):
+        n_f_ice = _ice_efficiency(minimum_fuel_consumption, heating_value)
+        # Electric/Fuel Cell: η_sys = consumption_benchmark / consumption_real
+        n_f_electric = np.where(consumption_real > 0, consumption_benchmark / consumption_real, 0.85)
+        # Hybrid: η_hybrid = 1 / [(α/η_EV) + (1-α)/η_ICE]
+        n_f_hybrid = np.where((utility_factor > 0) & (utility_factor < 1),
+                              1.0 / ((utility_factor / n_ev) + ((1 - utility_factor) / n_ice)),
+                              n_ice)
+    n_f = np.select([energy_cat == ENERGY_ICE, energy_cat == ENERGY_ELECTRIC, energy_cat == ENERGY_HYBRID],
+                    [n_f_ice, n_f_electric, n_f_hybrid], default=0.40)
+    return (1.0 - n_f) * 100.0
+
+
+# 2.2.- OBSOLESCENCE
+def obsolescence_vec(yearly_obsolescence_rate, model_age):
+    # 1 - exp(-x) as -expm1(-x): no cancellation for small x (matters in float32)
+    return -np.expm1(-yearly_obsolescence_rate * model_age) * 100
+
+
+# 2.3.- CHARGING
+def charging_vec(is_charging, E_annual_kwh, C_bat_kwh, DoD, S_slow, S_fast, S_ultra,
+                 d_slow, d_fast, d_ultra, k_d):
+    '''Charging penalty (%), 0 for the rows that are not battery charged.'''
+    with np.errstate(divide='ignore', invalid='ignore'):
+        degradation_per_cycle = S_slow * d_slow + S_fast * d_fast + S_ultra * d_ultra
+        cycles = np.where((C_bat_kwh > 0) & (DoD > 0), E_annual_kwh / (C_bat_kwh * DoD), 0.0)
+        # 1 - health_charging, with health_charging = exp(-k_d * cycles * degradation_per_cycle)
+        health_loss = -np.expm1(-k_d * cycles * degradation_per_cycle)
+    return np.where(is_charging, health_loss * 100.0, 0.0)
+
+
+# 2.4.- WARRANTY
+def warranty_vec(warranty_code, warranty, vehicle_age, travel_measure):
+    '''Warranty penalty (%) from WarrantyType codes, masked arithmetic only; NaN for unknown (-1) codes.'''
+    elapsed = np.where(warranty_code == WarrantyType.YEARS, vehicle_age, travel_measure)
+    has_warranty = warranty > 0
+    # (1 - DW) * 100 with DW = 1 - elapsed / warranty: the used fraction directly
+    used = np.where(has_warranty, elapsed / np.where(has_warranty, warranty, 1.0), 1.0)
+    return np.where(warranty_code >= 0, used * 100.0, np.nan)
+
+
+# 3.- EXTERNAL FACTORS
+def external_factors_vec(energy_price_factor, energy_price, cO2_taxes_factor, c02_taxes,
+                         subsidies_factor, subsidies, number_of_vehicles):
+    return (energy_price_factor * energy_price + c02_taxes * cO2_taxes_factor
+            + subsidies * subsidies_factor) * number_of_vehicles
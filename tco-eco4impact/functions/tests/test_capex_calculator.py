@@ -0,0 +1,136 @@
+import unittest
+import os
+import sys
+from array import array
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from cosapp.drivers import RunOnce
+from functions.capex_calculator import VehicleCAPEXCalculator
+from functions.discounting import capital_recovery_factor
+from models.fleet_energy import FleetEnergy, FleetEntry, STREAM_SLOW, STREAM_FAST, STREAM_ULTRA, STREAM_PRIVATE
+
+
+BET_FLEET = {
+    "1": {"E_t": 250.0, "Private_S_t": 0.60, "Private_F_t": 0.30, "Private_U_t": 0.10},
+    "2": {"E_t": 280.0, "Private_S_t": 0.50, "Private_F_t": 0.40, "Private_U_t": 0.10},
+    "3": {"E_t": 230.0, "Private_S_t": 0.70, "Private_F_t": 0.20, "Private_U_t": 0.10},
+}
+
+CAPEX_OUTPUTS = [
+    "E_total_slow", "E_total_fast", "E_total_ultra", "E_total_private",
+    "c_infrastructure_hardware", "c_infrastructure_cost", "c_capex_total",
+]
+
+
+def run_capex(vehicle_dict, type_energy="BET", vehicle_id=2):
+    capex = VehicleCAPEXCalculator("capex_test")
+    vp = capex.in_vehicle_properties
+    vp.type_energy = type_energy
+    vp.vehicle_id = vehicle_id
+    vp.vehicle_number = len(vehicle_dict)
+    vp.vehicle_dict = vehicle_dict
+    capex.add_driver(RunOnce("run"))
+    capex.run_drivers()
+    return capex
+
+
+class TestCAPEXFleetEnergy(unittest.TestCase):
+    """FleetEnergy arrays give the same CAPEX as the nested vehicle_dict."""
+
+    def test_from_vehicle_dict(self):
+        fleet = FleetEnergy.from_vehicle_dict(BET_FLEET)
+        self.assertEqual(len(fleet), 3)
+        self.assertEqual(fleet.vehicle("2"), (280.0, 0.5, 0.4, 0.1, 0.0))
+        self.assertEqual(fleet.vehicle(99), (0.0, 0.0, 0.0, 0.0, 0.0))
+        slow, fast, ultra = fleet.charging_totals()
+        self.assertAlmostEqual(slow, 250 * 0.6 + 280 * 0.5 + 230 * 0.7)
+
+    def test_from_vehicles(self):
+        entries = [FleetEntry(v["E_t"], v["Private_S_t"], v["Private_F_t"], v["Private_U_t"]) for v in BET_FLEET.values()]
+        fleet = FleetEnergy.from_vehicles(entries)
+        self.assertEqual(fleet.charging_totals(), FleetEnergy.from_vehicle_dict(BET_FLEET).charging_totals())
+        self.assertEqual(fleet.vehicle(3), (230.0, 0.7, 0.2, 0.1, 0.0))
+        self.assertEqual(fleet.vehicle(None), (0.0, 0.0, 0.0, 0.0, 0.0))
+
+        sparse = FleetEnergy.from_vehicles(entries, vehicle_ids=[10, 20, 30])
+        self.assertEqual(sparse.vehicle(20), (280.0, 0.5, 0.4, 0.1, 0.0))
+        self.assertEqual(sparse.vehicle(2), (0.0, 0.0, 0.0, 0.0, 0.0))
+
+    def test_float32_storage(self):
+        fleet32 = FleetEnergy.from_vehicle_dict(BET_FLEET, dtype=np.float32)
+        fleet64 = FleetEnergy.from_vehicle_dict(BET_FLEET)
+        self.assertEqual(fleet32.E_t.dtype, np.float32)
+        for total32, total64 in zip(fleet32.charging_totals(), fleet64.charging_totals()):
+            self.assertIsInstance(total32, float)
+            self.assertAlmostEqual(total32, total64, places=3)
+
+    def test_from_columns_shares_buffers(self):
+        E_t = array('f', (250.0, 280.0, 230.0))
+        S = array('f', (0.6, 0.5, 0.7))
+        fleet = FleetEnergy.from_columns(E_t, S)
+        self.assertEqual(fleet.E_t.dtype, np.float32)
+        self.assertEqual(fleet.vehicle(2)[2:], (0.0, 0.0, 0.0))
+        E_t[0] = 300.0
+        self.assertEqual(fleet.E_t[0], 300.0)
+        self.assertAlmostEqual(fleet.charging_totals()[0], 300 * 0.6 + 280 * 0.5 + 230 * 0.7, places=3)
+
+    def test_streams_mask(self):
+        fleet = FleetEnergy.from_vehicle_dict(BET_FLEET)
+        self.assertEqual(fleet.streams, STREAM_SLOW | STREAM_FAST | STREAM_ULTRA)
+        self.assertEqual(fleet.private_total(), 0.0)
+
+        # Shares of vehicles without energy do not activate a stream
+        idle = FleetEnergy.from_vehicles([(0.0, 0.0, 0.0, 0.0, 1.0), (100.0, 1.0)])
+        self.assertEqual(idle.streams, STREAM_SLOW)
+        self.assertEqual(idle.charging_totals(), (100.0, 0.0, 0.0))
+
+    def test_vehicle_dict_edited_in_place(self):
+        vehicle_dict = {vid: dict(vdata) for vid, vdata in BET_FLEET.items()}
+        capex = run_capex(vehicle_dict)
+        # Same vehicles, same size: only a share changes
+        vehicle_dict["1"]["Private_S_t"] = 0.9
+        # Same dict written back to the port: the system runs again and sees the new content
+        capex.in_vehicle_properties.vehicle_dict = vehicle_dict
+        capex.run_drivers()
+        expected = run_capex(vehicle_dict)
+        for name in ("E_total_slow", "E_total_fast", "E_total_ultra"):
+            self.assertEqual(getattr(capex, name), getattr(expected, name), msg=name)
+
+    def test_capex_matches_dict(self):
+        from_dict = run_capex(BET_FLEET)
+        from_arrays = run_capex(FleetEnergy.from_vehicle_dict(BET_FLEET))
+        for name in CAPEX_OUTPUTS:
+            self.assertAlmostEqual(getattr(from_arrays, name), getattr(from_dict, name), msg=name)
+
+
+class TestCAPEXAnnualization(unittest.TestCase):
+    """Vectorized CRF gives the c_crf of the CoSApp system."""
+
+    def test_crf_matches_system(self):
+        loan_years = [1, 5, 10, 20]
+        expected = []
+        for years in loan_years:
+            capex = VehicleCAPEXCalculator("capex_crf")
+            capex.in_vehicle_properties.vehicle_number = 1
+            capex.in_vehicle_properties.loan_years = years
+            capex.add_driver(RunOnce("run"))
+            capex.run_drivers()
+            expected.append(capex.c_crf)
+            rate = _financing_rate(capex)
+        np.testing.assert_allclose(capital_recovery_factor(rate, loan_years), expected)
+
+    def test_crf_without_interest(self):
+        np.testing.assert_array_equal(capital_recovery_factor([0.0, -0.01], [10, 10]), [1.0, 1.0])
+
+
+def _financing_rate(capex):
+    # base rate + ESG adjustment of the energy type, as in compute_c_financing_cost
+    fin_params = capex.get_financing_params()
+    esg = fin_params.get('esg_adjustments', {}).get(capex.in_vehicle_properties.type_energy, 0.0)
+    return fin_params.get('base_interest_rate', 0.04) + esg
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,35 @@
+import unittest
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from functions.discounting import discount_factors, discount_sum, annuity_factors
+
+
+class TestOPEXDiscounting(unittest.TestCase):
+    """Closed-form annuity factor of the OPEX against the explicit sum_t 1/(1+r)^t."""
+
+    RATES = [0.01, 0.05, 0.12]
+    YEARS = [1, 5, 20]
+
+    def test_discount_sum_matches_explicit_sum(self):
+        for rate in self.RATES:
+            for years in self.YEARS:
+                explicit = sum(1.0 / (1.0 + rate) ** t for t in range(1, years + 1))
+                self.assertAlmostEqual(discount_sum(rate, years), explicit, places=12)
+                self.assertAlmostEqual(discount_sum(rate, years), discount_factors(rate, years).sum(), places=12)
+
+    def test_discount_sum_without_discount(self):
+        for years in self.YEARS:
+            self.assertEqual(discount_sum(0.0, years), years)
+
+    def test_annuity_factors_match_discount_sum(self):
+        rates, years = np.meshgrid([0.0] + self.RATES, self.YEARS)
+        expected = [discount_sum(r, n) for r, n in zip(rates.ravel(), years.ravel())]
+        np.testing.assert_allclose(annuity_factors(rates, years).ravel(), expected, rtol=1e-14)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
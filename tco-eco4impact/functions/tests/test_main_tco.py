@@ -0,0 +1,184 @@
+import unittest
+import io
+import os
+import sys
+import threading
+from contextlib import redirect_stdout
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from main_tco import (run_tco_scenario, run_tco_sweep, run_tco_batch, run_capex, run_opex_truck, run_opex_ship,
+                      run_rv, _scenario_inputs)
+from inputs.gen_truck_in import make_example_truck_inputs, make_example_truck_case
+from inputs.gen_ship_in import make_example_ship_inputs, make_example_ship_case
+from inputs.frozen import to_key
+from inputs.gen_inputs import build_lazy_inputs
+
+
+# TCO totals of the example scenarios (console output of main_tco.py)
+TRUCK_TCO_TOTAL = 700_705.92
+SHIP_TCO_TOTAL = 37_501_605_330.92
+
+# Every field of the truck example (CAPEX per year: 30,330.92 € over 5 years)
+TRUCK_RESULT = {"capex_per_year": 30_330.92 / 5, "opex_per_year": 134_075.0, "rv": 0.0, "tco_total": TRUCK_TCO_TOTAL}
+
+
+class TestTCOScenario(unittest.TestCase):
+    """run_tco_scenario on the example inputs."""
+
+    def test_truck_default_example(self):
+        result = run_tco_scenario(make_example_truck_inputs())
+        self.assertAlmostEqual(result.tco_total, TRUCK_TCO_TOTAL, delta=0.01)
+
+    def test_result_fields(self):
+        result = run_tco_scenario(make_example_truck_inputs())
+        for name, expected in TRUCK_RESULT.items():
+            self.assertAlmostEqual(getattr(result, name), expected, delta=0.01, msg=name)
+
+    def test_result_reads_like_a_dict(self):
+        # Callers of the former dict result keep working
+        result = run_tco_scenario(make_example_truck_inputs())
+        self.assertEqual(result["tco_total"], result.tco_total)
+        self.assertEqual(tuple(result.keys()), tuple(TRUCK_RESULT))
+        self.assertEqual(list(result), list(TRUCK_RESULT))
+        self.assertEqual(len(result), len(TRUCK_RESULT))
+        self.assertIn("tco_total", result)
+        self.assertNotIn("npv", result)
+        self.assertEqual(result.get("rv"), result.rv)
+        self.assertIsNone(result.get("npv"))
+        self.assertEqual(dict(result.items()), {name: getattr(result, name) for name in TRUCK_RESULT})
+        self.assertEqual(list(result.values()), [getattr(result, name) for name in TRUCK_RESULT])
+        self.assertEqual(dict(result), dict(result.items()))
+        with self.assertRaises(KeyError):
+            result["npv"]
+
+    def test_ship_default_example(self):
+        # Read-only example (crew_list frozen to a tuple) runs without thawing it first
+        result = run_tco_scenario(make_example_ship_inputs())
+        self.assertAlmostEqual(result.tco_total, SHIP_TCO_TOTAL, delta=0.01)
+
+    def test_lazy_inputs(self):
+        self.assertAlmostEqual(run_tco_scenario(build_lazy_inputs("truck")).tco_total, TRUCK_TCO_TOTAL, delta=0.01)
+        self.assertAlmostEqual(run_tco_scenario(build_lazy_inputs("ship")).tco_total, SHIP_TCO_TOTAL, delta=0.01)
+
+    def test_concurrent_matches_sequential(self):
+        for asset in ("truck", "ship"):
+            with self.subTest(asset=asset):
+                inputs = build_inputs_of(asset)
+                self.assertEqual(run_tco_scenario(inputs, concurrent=True), run_tco_scenario(inputs))
+        # The pool is scoped to the call: no worker thread is left behind
+        self.assertFalse([t for t in threading.enumerate() if t.name.startswith("tco")])
+
+    def test_sweep_default_examples(self):
+        sweep = run_tco_sweep([make_example_truck_inputs(), make_example_ship_inputs()])
+        self.assertAlmostEqual(sweep["tco_total"][0], TRUCK_TCO_TOTAL, delta=0.01)
+        self.assertAlmostEqual(sweep["tco_total"][1], SHIP_TCO_TOTAL, delta=0.01)
+
+
+class TestVerbose(unittest.TestCase):
+    """Reports are printed only with verbose=True."""
+
+    def run_quiet(self, func, *args):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            func(*args)
+        return out.getvalue()
+
+    def test_quiet_by_default(self):
+        for asset in ("truck", "ship"):
+            with self.subTest(asset=asset):
+                inputs = build_inputs_of(asset, mutable=True)
+                self.assertEqual(self.run_quiet(run_tco_scenario, inputs), "")
+                self.assertEqual(self.run_quiet(run_capex, inputs), "")
+                self.assertEqual(self.run_quiet(run_rv, inputs["rv"]), "")
+        self.assertEqual(self.run_quiet(run_opex_truck, build_inputs_of("truck", mutable=True)["opex_truck"]), "")
+        self.assertEqual(self.run_quiet(run_opex_ship, build_inputs_of("ship", mutable=True)["opex_ship"]), "")
+
+    def test_verbose_report(self):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            run_tco_scenario(make_example_truck_inputs(), verbose=True)
+        self.assertIn("TRUCK OPEX CALCULATION RESULTS", out.getvalue())
+        self.assertIn("TCO total: 700,705.92 €", out.getvalue())
+        self.assertNotIn("Hello World", out.getvalue())
+
+
+class TestScenarioInputs(unittest.TestCase):
+    """Every input form is normalized to the plain dict read by the wrappers."""
+
+    FORMS = {
+        "dict": lambda asset: build_inputs_of(asset, mutable=True),
+        "frozen": lambda asset: build_inputs_of(asset),
+        "typed": lambda asset: {"truck": make_example_truck_case, "ship": make_example_ship_case}[asset](),
+        "lazy": build_lazy_inputs,
+    }
+
+    def test_forms_match_plain_dict(self):
+        for asset in ("truck", "ship"):
+            reference = build_inputs_of(asset, mutable=True)
+            for form, make in self.FORMS.items():
+                with self.subTest(asset=asset, form=form):
+                    scenario = _scenario_inputs(make(asset))
+                    self.assertEqual(scenario, reference)
+                    self.assertIsInstance(scenario["capex"]["vehicle_dict"], dict)
+
+    def test_ship_crew_list_is_a_list(self):
+        for form, make in self.FORMS.items():
+            with self.subTest(form=form):
+                self.assertIsInstance(_scenario_inputs(make("ship"))["opex_ship"]["crew_list"], list)
+
+    def test_forms_give_same_tco(self):
+        for asset, expected in (("truck", TRUCK_TCO_TOTAL), ("ship", SHIP_TCO_TOTAL)):
+            for form, make in self.FORMS.items():
+                with self.subTest(asset=asset, form=form):
+                    self.assertAlmostEqual(run_tco_scenario(make(asset)).tco_total, expected, delta=0.01)
+
+    def test_batch_of_every_form(self):
+        # Sent to worker processes: every form must come out picklable
+        scenarios = [make(asset) for make in self.FORMS.values() for asset in ("truck", "ship")]
+        tco = run_tco_batch(scenarios, n_jobs=2, as_arrays=True)["tco_total"]
+        np.testing.assert_allclose(tco, [TRUCK_TCO_TOTAL, SHIP_TCO_TOTAL] * len(self.FORMS), atol=0.01)
+
+
+class TestCachedVariants(unittest.TestCase):
+    """make_example_*_inputs(overrides=...) returns one shared read-only variant per overrides."""
+
+    OVERRIDES = {
+        "truck": {("capex", "purchase_price"): 80_000.0},
+        "ship": {("opex_ship", "n_trips_per_year"): 20.0},
+    }
+
+    def test_variant_runs_as_returned(self):
+        for asset, overrides in self.OVERRIDES.items():
+            with self.subTest(asset=asset):
+                shared = build_inputs_of(asset, overrides=overrides)
+                copy = build_inputs_of(asset, mutable=True, overrides=overrides)
+                self.assertEqual(run_tco_scenario(shared), run_tco_scenario(copy))
+
+    def test_variant_is_not_changed_by_callers(self):
+        for asset, overrides in self.OVERRIDES.items():
+            with self.subTest(asset=asset):
+                shared = build_inputs_of(asset, overrides=overrides)
+                before = to_key(shared)
+                self.assertIs(build_inputs_of(asset, overrides=overrides), shared)
+
+                # Read-only for every caller
+                with self.assertRaises(TypeError):
+                    shared["capex"]["purchase_price"] = 1.0
+                # Editable copies and scenario runs do not write through to the shared variant
+                copy = build_inputs_of(asset, mutable=True, overrides=overrides)
+                copy["capex"]["purchase_price"] = 1.0
+                copy["capex"]["vehicle_dict"]["1"]["E_t"] = 1.0
+                _scenario_inputs(shared)["opex_" + asset].clear()
+                run_tco_scenario(shared)
+                self.assertEqual(to_key(build_inputs_of(asset, overrides=overrides)), before)
+
+
+def build_inputs_of(asset, **kwargs):
+    """make_example_<asset>_inputs(**kwargs)."""
+    return {"truck": make_example_truck_inputs, "ship": make_example_ship_inputs}[asset](**kwargs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,260 @@
+import unittest
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from functions import rv_calculator
+from functions.rv_calculator import ResidualValueCalculator, BATCH_VEHICLE_COLUMNS
+from functions.db_tables import COUNTRY_METRIC_IDX, save_rv_tables, load_rv_tables
+from functions.rv_fast import compute_rv, rv_vehicle_inputs, RVCountryInputs
+from functions.rv_vectorized import (ENERGY_ICE, ENERGY_ELECTRIC, ENERGY_OTHER, efficiency_vec, warranty_vec,
+                                     ice_efficiency_penalty_vec, SWEEP_DTYPE)
+
+
+RV_OUTPUTS = [
+    "total_depreciation", "efficiency_penalty", "obsolescence_penalty", "charging_penalty",
+    "warranty_penalty", "total_impact_health", "total_external_factors", "rv"
+]
+
+
+def make_vehicle(**overrides):
+    """Vehicle properties with the same defaults as VehiclePropertiesPort."""
+    vehicle = dict(
+        type_vehicle="truck", type_energy="DIESEL", registration_country="France",
+        purchase_cost=150000.0, travel_measure=600000.0, maintenance_cost=7000.0,
+        minimum_fuel_consumption=250.0, consumption_real=0.0, utility_factor=0.0,
+        E_annual_kwh=0.0, C_bat_kwh=0.0, DoD=0.8, S_slow=0.0, S_fast=0.0, S_ultra=0.0,
+        powertrain_model_year=2020, warranty=5.0, type_warranty="year",
+        year_purchase=2020, current_year=2025, vehicle_number=1,
+    )
+    vehicle.update(overrides)
+    return SimpleNamespace(**vehicle)
+
+
+FLEET = [
+    make_vehicle(),
+    make_vehicle(type_energy="BEV", consumption_real=25.0, vehicle_number=3),
+    make_vehicle(type_energy="BEV", consumption_real=0.0, type_warranty="km", warranty=800000.0),
+    make_vehicle(type_energy="PHEV", registration_country="Germany"),
+    make_vehicle(type_energy="H2_ICE", minimum_fuel_consumption=300.0, year_purchase=2018),
+    make_vehicle(type_warranty="years", year_purchase=2022),
+    make_vehicle(type_energy="BEV", consumption_real=22.0, E_annual_kwh=90000.0, C_bat_kwh=500.0,
+                 S_slow=0.5, S_fast=0.3, S_ultra=0.2),
+]
+
+
+class TestResidualValueFleet(unittest.TestCase):
+    """Fleet (vectorized) RV must match the scalar CoSApp compute."""
+
+    def setUp(self):
+        self.rv = ResidualValueCalculator("rv_test")
+        cp = self.rv.in_country_properties
+        cp.energy_price = 1.5
+        cp.c02_taxes = 500.0
+        cp.subsidies = 1000.0
+
+    def compute_scalar(self, vehicle):
+        vp = self.rv.in_vehicle_properties
+        for name, value in vars(vehicle).items():
+            setattr(vp, name, value)
+        self.rv.compute()
+        return {name: getattr(self.rv, name) for name in RV_OUTPUTS}
+
+    def test_fleet_matches_scalar(self):
+        fleet = self.rv.compute_fleet(FLEET)
+        for i, vehicle in enumerate(FLEET):
+            expected = self.compute_scalar(vehicle)
+            for name in RV_OUTPUTS:
+                self.assertAlmostEqual(fleet[name][i], expected[name], places=6,
+                                       msg=f"{name} for vehicle {i} ({vehicle.type_energy})")
+
+    def test_single_energy_fleet_matches_scalar(self):
+        # Same (country, energy) for every vehicle: shared depreciation rates
+        vehicles = [make_vehicle(travel_measure=100000.0 * k, year_purchase=2018 + k) for k in range(4)]
+        fleet = self.rv.compute_fleet(vehicles)
+        for i, vehicle in enumerate(vehicles):
+            expected = self.compute_scalar(vehicle)
+            self.assertAlmostEqual(fleet["total_depreciation"][i], expected["total_depreciation"], places=6)
+
+    def test_fast_api_matches_scalar(self):
+        country = RVCountryInputs(energy_price=1.5, c02_taxes=500.0, subsidies=1000.0)
+        for vehicle in FLEET:
+            expected = self.compute_scalar(vehicle)
+            results = compute_rv(rv_vehicle_inputs(vars(vehicle)), country)
+            for name in RV_OUTPUTS:
+                self.assertAlmostEqual(getattr(results, name), expected[name], places=6, msg=name)
+
+    def test_year_and_years_warranty(self):
+        year = self.compute_scalar(make_vehicle(type_warranty="year"))
+        years = self.compute_scalar(make_vehicle(type_warranty="years"))
+        self.assertEqual(years["warranty_penalty"], year["warranty_penalty"])
+        self.assertAlmostEqual(year["warranty_penalty"], 100.0)  # 5 years elapsed of a 5 years warranty
+
+    def test_steps_on_snapshot(self):
+        expected = self.compute_scalar(FLEET[1])
+        snap = self.rv.snapshot_inputs()
+        self.assertEqual(self.rv.compute_depreciation(snap), expected["total_depreciation"])
+        self.assertEqual(self.rv.compute_impact_health(snap), expected["total_impact_health"])
+        self.assertEqual(self.rv.compute_external_factors(snap), expected["total_external_factors"])
+
+    def test_each_step_matches_compute(self):
+        steps = {"total_depreciation": "compute_depreciation", "efficiency_penalty": "compute_eficiency",
+                 "obsolescence_penalty": "compute_obsolescence", "charging_penalty": "compute_charging",
+                 "warranty_penalty": "compute_warranty", "total_external_factors": "compute_external_factors"}
+        for i, vehicle in enumerate(FLEET):
+            expected = self.compute_scalar(vehicle)
+            for name, step in steps.items():
+                self.assertEqual(getattr(self.rv, step)(vehicle), expected[name], msg=f"{step} for vehicle {i}")
+
+    def test_params_cached_per_country_and_energy(self):
+        params = self.rv._get_params(make_vehicle())
+        self.assertIs(self.rv._get_params(make_vehicle(purchase_cost=1.0)), params)
+        self.assertIsNot(self.rv._get_params(make_vehicle(type_energy="BEV")), params)
+        data = self.rv._countries_data["France"]["depreciation"]
+        self.assertEqual(params.rate_per_year, data["depreciation_rate_per_year"]["DIESEL"])
+
+    def test_compute_cache(self):
+        expected = self.compute_scalar(make_vehicle())
+        self.compute_scalar(make_vehicle(type_energy="BEV"))
+        self.assertEqual(len(self.rv._compute_cache), 2)
+        self.assertEqual(self.compute_scalar(make_vehicle()), expected)
+        self.assertEqual(len(self.rv._compute_cache), 2)
+
+        self.rv.in_country_properties.c02_taxes = 0.0
+        self.assertNotEqual(self.compute_scalar(make_vehicle()), expected)
+
+    def test_batch_codes_match_fleet(self):
+        fleet = self.rv.compute_fleet(FLEET)
+        ci, ei, warranty_type = self.rv.rv_codes([v.registration_country for v in FLEET],
+                                                 [v.type_energy for v in FLEET],
+                                                 [v.type_warranty for v in FLEET])
+        vehicles = {name: np.array([getattr(v, name) for v in FLEET], dtype=float)
+                    for name in BATCH_VEHICLE_COLUMNS}
+        vehicles.update(country_idx=ci, energy_idx=ei, warranty_type=warranty_type)
+        batch = self.rv.compute_batch(vehicles)
+        for name in RV_OUTPUTS:
+            np.testing.assert_allclose(batch[name], fleet[name], err_msg=name)
+
+    def test_unknown_warranty_type_is_nan(self):
+        unknown = make_vehicle(type_warranty="months")
+        self.assertTrue(np.isnan(self.compute_scalar(unknown)["warranty_penalty"]))
+
+    def test_bev_charging_penalty(self):
+        charged = self.compute_scalar(FLEET[-1])
+        self.assertGreater(charged["charging_penalty"], 0.0)
+        self.assertEqual(self.compute_scalar(make_vehicle())["charging_penalty"], 0.0)
+
+    def test_float32_batch_matches_float64(self):
+        vehicles = {name: [getattr(v, name) for v in FLEET]
+                    for name in BATCH_VEHICLE_COLUMNS + ("registration_country", "type_energy", "type_warranty")}
+        reference = self.rv.compute_batch(vehicles)
+        sweep = self.rv.compute_batch(vehicles, dtype=SWEEP_DTYPE)
+        for name in RV_OUTPUTS:
+            self.assertEqual(sweep[name].dtype, np.float32, msg=name)
+            np.testing.assert_allclose(sweep[name], reference[name], rtol=1e-5,
+                                       atol=1e-5 * np.abs(reference[name]).max(), err_msg=name)
+
+    @unittest.skipUnless(rv_calculator.njit is not None, "numba is not installed")
+    def test_jit_kernel_matches_python(self):
+        # NaN inputs (unknown warranty type, parameters the database does not define) included
+        kernel = rv_calculator._rv_kernel
+        vehicles = FLEET + [make_vehicle(type_warranty="months"), make_vehicle(warranty=0.0),
+                            make_vehicle(type_energy="PHEV", utility_factor=0.4)]
+        for vehicle in vehicles:
+            args = self.rv._kernel_args(vehicle, 1.5, 500.0, 1000.0)
+            np.testing.assert_array_equal(kernel(*args), kernel.py_func(*args),
+                                          err_msg=f"{vehicle.type_energy} / {vehicle.type_warranty}")
+
+    def test_fleet_output_shape(self):
+        fleet = self.rv.compute_fleet(FLEET)
+        self.assertEqual(set(fleet), set(RV_OUTPUTS))
+        for values in fleet.values():
+            self.assertEqual(values.shape, (len(FLEET),))
+
+
+class TestResidualValueValidation(unittest.TestCase):
+    """Invalid inputs are rejected before compute, not inside it."""
+
+    def setUp(self):
+        self.rv = ResidualValueCalculator("rv_test")
+
+    def test_unknown_country(self):
+        with self.assertRaises(ValueError):
+            self.rv._validate_inputs(make_vehicle(registration_country="Atlantis"))
+
+    def test_unknown_energy_type(self):
+        with self.assertRaises(ValueError):
+            self.rv._validate_inputs(make_vehicle(type_energy="STEAM"))
+
+    def test_negative_vehicle_age(self):
+        with self.assertRaises(ValueError):
+            self.rv._validate_inputs(make_vehicle(year_purchase=2030))
+
+    def test_unknown_warranty_type(self):
+        with self.assertRaises(ValueError):
+            self.rv._validate_inputs(make_vehicle(type_warranty="months"))
+        with self.assertRaises(ValueError):
+            self.rv.compute_fleet([make_vehicle(type_warranty="months")])
+
+    def test_fleet_is_validated(self):
+        with self.assertRaises(ValueError):
+            self.rv.compute_fleet([make_vehicle(), make_vehicle(registration_country="Atlantis")])
+
+
+class TestResidualValueTables(unittest.TestCase):
+    """Dense tables hold the same values as the JSON database."""
+
+    def setUp(self):
+        self.rv = ResidualValueCalculator("rv_test")
+        self.tables = self.rv.get_rv_tables()
+
+    def test_tables_match_json(self):
+        countries = list(self.tables['countries'])
+        energy_types = list(self.tables['energy_types'])
+        for country, data in self.rv._countries_data.items():
+            rates = data["depreciation"]["depreciation_rate_per_year"]
+            for te, value in rates.items():
+                ci, ei = countries.index(country), energy_types.index(te)
+                self.assertEqual(self.tables['country_params'][ci, ei, COUNTRY_METRIC_IDX["depreciation_rate_per_year"]], value)
+
+    def test_npz_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "db.json")
+            open(db_path, 'w').close()
+            save_rv_tables(self.tables, os.path.join(tmp, "db_rv.npz"))
+            loaded = load_rv_tables(db_path)
+        self.assertEqual(set(loaded), set(self.tables))
+        for name, values in self.tables.items():
+            np.testing.assert_array_equal(loaded[name], values)
+
+
+class TestResidualValueVectorized(unittest.TestCase):
+    """Array equations select the branch of each row from its codes."""
+
+    def test_efficiency_branches(self):
+        ones = np.ones(3)
+        penalty = efficiency_vec(np.array([ENERGY_ICE, ENERGY_ELECTRIC, ENERGY_OTHER], dtype=np.uint8),
+                                 ones * 360.0, ones * 25.0, np.array([0.0, 20.0, 0.0]), ones * 17.0,
+                                 ones * 0.0, ones * np.nan, ones * np.nan)
+        np.testing.assert_allclose(penalty, [60.0, 15.0, 60.0])
+
+    def test_ice_efficiency_grid(self):
+        sfc = np.array([200.0, 250.0, 300.0])
+        heating_values = np.array([40.0, 45.0])
+        grid = ice_efficiency_penalty_vec(sfc[:, None], heating_values[None, :])
+        self.assertEqual(grid.shape, (3, 2))
+        self.assertAlmostEqual(grid[1, 0], (1.0 - 3600 / (250.0 * 40.0)) * 100.0)
+        np.testing.assert_array_equal(ice_efficiency_penalty_vec(sfc, 40.0, fuel_mask=sfc > 220.0)[0], 0.0)
+
+    def test_warranty_codes(self):
+        penalty = warranty_vec(np.array([0, 1, -1]), np.array([5.0, 800000.0, 5.0]),
+                               np.array([2.0, 2.0, 2.0]), np.array([200000.0, 200000.0, 200000.0]))
+        np.testing.assert_allclose(penalty, [40.0, 25.0, np.nan])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
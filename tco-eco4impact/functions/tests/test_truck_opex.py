@@ -1,10 +1,16 @@
 import unittest
 import json
 import os
+import sys
+from dataclasses import replace
 from unittest.mock import patch, mock_open, MagicMock
 import tempfile
 import shutil
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from functions.Opex_Calculator import TruckOPEXCalculator, normalize_key, NORMALIZED_KEYS_CACHE_SIZE
+
 
 class TestOPEXPort(unittest.TestCase):
     """Test cases for OPEXPort class."""
@@ -454,6 +460,49 @@ class TestDataValidation(unittest.TestCase):
         self.assertTrue(all(e == "DIESEL" for e in normalized))
 
 
+class TestTruckOPEXParams(unittest.TestCase):
+    """Database parameters resolved by get_params on the trucks database."""
+
+    def setUp(self):
+        # Inwards: DIESEL / N3 in France (defaults of the system)
+        self.opex = TruckOPEXCalculator("opex")
+
+    def test_params_of_snapshot(self):
+        # The parameters come from the snapshot, not from the inwards
+        vi = replace(self.opex.snapshot_inputs(), type_energy="bev", size_vehicle="n1")
+        self.assertEqual(self.opex.get_params(vi).toll_price_per_km, 0.12)
+        self.assertEqual(self.opex.get_params().toll_price_per_km, 0.097)
+        # The key of the snapshot is not left with the parameters of the inwards
+        self.assertEqual(self.opex.get_params(vi).toll_price_per_km, 0.12)
+
+    def test_steps_on_snapshot(self):
+        # compute_o_* on a snapshot that differs from the inwards == compute() with those inwards
+        changes = dict(registration_country="Germany", type_energy="BEV", size_vehicle="N1",
+                       annual_distance_travel=50000.0, consumption_energy=30000.0, team_count=2)
+        vi = replace(self.opex.snapshot_inputs(), **changes)
+        reference = TruckOPEXCalculator("reference")
+        for name, value in changes.items():
+            setattr(reference, name, value)
+        reference.compute()
+
+        for step in ("o_taxes", "o_tolls", "o_insurance", "o_crew", "o_energy"):
+            with self.subTest(step=step):
+                self.assertEqual(getattr(self.opex, f"compute_{step}")(vi), getattr(reference, step))
+
+
+class TestNormalizeKey(unittest.TestCase):
+    """Normalized database keys of user values."""
+
+    def test_normalized_and_interned(self):
+        self.assertEqual(normalize_key(" diesel "), "DIESEL")
+        self.assertIs(normalize_key("bev"), normalize_key("Bev "))
+
+    def test_cache_is_bounded(self):
+        for i in range(2 * NORMALIZED_KEYS_CACHE_SIZE):
+            normalize_key(f"user key {i}")
+        self.assertLessEqual(normalize_key.cache_info().currsize, NORMALIZED_KEYS_CACHE_SIZE)
+
+
 if __name__ == "__main__":
     # Run tests with verbose output
     unittest.main(verbosity=2)
\ No newline at end of file
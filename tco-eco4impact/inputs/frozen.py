@@ -0,0 +1,52 @@
+"""
+Read-only views of the example input dictionaries.
+
+The example inputs are built once at import time and shared: dicts are wrapped
+in MappingProxyType and lists turned into tuples so callers cannot mutate the
+shared template. thaw() returns an independent, plain dict/list copy for the
+callers that need to edit the inputs or hand them to CoSApp ports (which
+expect real dicts and lists).
+"""
+from types import MappingProxyType
+from typing import Any
+
+
+def freeze(value: Any) -> Any:
+    """Recursively wrap dicts in MappingProxyType and turn lists into tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Mutable deep copy of a frozen value (MappingProxyType -> dict, tuple -> list)."""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(v) for v in value]
+    return value
+
+
+# Tags of the hashable form (dicts and lists are not hashable)
+_DICT_KEY = object()
+_LIST_KEY = object()
+
+
+def to_key(value: Any) -> Any:
+    """Hashable form of a (frozen or plain) nested value, e.g. for cache keys."""
+    if isinstance(value, (dict, MappingProxyType)):
+        return (_DICT_KEY, tuple(sorted(((k, to_key(v)) for k, v in value.items()), key=lambda item: repr(item[0]))))
+    if isinstance(value, (list, tuple)):
+        return (_LIST_KEY, tuple(to_key(v) for v in value))
+    return value
+
+
+def from_key(key: Any) -> Any:
+    """Plain nested value back from to_key()."""
+    if isinstance(key, tuple) and len(key) == 2 and key[0] is _DICT_KEY:
+        return {k: from_key(v) for k, v in key[1]}
+    if isinstance(key, tuple) and len(key) == 2 and key[0] is _LIST_KEY:
+        return [from_key(v) for v in key[1]]
+    return key
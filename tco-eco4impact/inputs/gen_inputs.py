@@ -0,0 +1,219 @@
+"""
+Single source for the example input dictionaries of trucks and ships.
+
+Both assets share the common data, CAPEX and RV sections; each asset only adds
+its description, its OPEX section and the fields that differ.
+"""
+import copy
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Optional
+
+from inputs.frozen import freeze, to_key, from_key
+
+
+def _base_inputs() -> dict:
+    """Secciones comunes (CAPEX / RV) de los ejemplos."""
+    # Valores repetidos en varias secciones: definidos una sola vez
+    powertrain_type = "DIESEL"
+    year = 2025
+
+    return {
+        # Datos comunes
+        "powertrain_type": powertrain_type,      # para CAPEX / RV (ajusta a tu DB)
+        "vehicle_weight_class": "heavy",
+        "country": "France",
+        "year": year,
+        "operation_years": 5,
+        "discount_rate": 0.0,             # tasa de descuento del OPEX anual
+
+        # ---------- CAPEX ----------
+        "capex": {
+            "powertrain_type": powertrain_type,
+            "vehicle_number": 1,
+            "vehicle_id": 1,
+            "vehicle_weight_class": "light",
+            "country": "FR",
+            "year": year,
+
+            # Vehicle acquisition
+            "is_new": True,
+            "owns_vehicle": False,
+            "purchase_price": 50000.0,
+            "conversion_cost": 0.0,
+            "certification_cost": 0.0,
+
+            # Infrastructure
+            "n_slow": None,
+            "n_fast": None,
+            "n_ultra": None,
+            "n_stations": 1,
+            "smart_charging_enabled": False,
+
+            # Financing
+            "loan_years": 10,
+
+            # Vehicle charging / energy structure (ONLY place where E_t, S_t, etc. are allowed)
+            "vehicle_dict": {
+                "1": {
+                    "E_t": 0.0,
+                    "S_t": 0.0,
+                    "F_t": 0.0,
+                    "U_t": 0.0,
+                    "Public_t": 0.0,
+                    "Private_t": 1.0
+                }
+            }
+        },
+
+        # ---------- RV ----------
+        "rv": {
+            "type_vehicle": "truck",
+            "type_energy": powertrain_type,
+            "registration_country": "France",
+            "purchase_cost": 150_000.0,
+            "year_purchase": 2020,
+            "current_year": year,
+            "travel_measure": 600_000.0,
+            "maintenance_cost": 7_000.0,
+            "minimum_fuel_consumption": 250.0,
+            "powertrain_model_year" : 2020,
+            "warranty" : 5.0,
+            "type_warranty" : 'years',
+
+            "energy_price": 1.5,
+            "co2_taxes": 500.0,
+            "subsidies":0.0,
+            "vehicle_number": 1,
+        },
+    }
+
+
+# Fields specific to each asset, overlaid on the common sections
+_ASSET_OVERRIDES = {
+    "truck": {
+        "asset_type": "truck",
+        "description": "Heavy diesel N3 in France",
+
+        # ---------- OPEX TRUCK ----------
+        "opex_truck": {
+            "purchase_cost": 150_000.0,
+            "type_energy": "DIESEL",
+            "size_vehicle": "N3",
+            "registration_country": "France",
+            "annual_distance_travel": 120_000.0,
+            "departure_city": "Paris",
+            "arrival_city": "Marseille",
+            "RV": 45_000.0,
+            "N_years": 5.0,
+            "team_count": 1,
+            "maintenance_cost": 7_000.0,
+            "consumption_energy": 42_000.0,
+            "fuel_multiplier": 1.0,
+            "EF_CO2_diesel": 2.65,
+        },
+    },
+    "ship": {
+        "asset_type": "ship",
+        "description": "Cargo ship diesel in France",
+
+        # ---------- OPEX SHIP ----------
+        "opex_ship": {
+            "country_reg": "France",
+            "country_oper": "France",
+            "ship_class": "cargo",
+            "length": 120.0,
+            "energy_type": "DIESEL",
+            "purchase_cost": 12_000_000.0,
+            "safety_class": "A",
+            "annual_distance": 20_000.0,
+            "n_trips_per_year": 10.0,
+            "days_per_trip": 4.0,
+            "planning_horizon_years": 1.0,
+            "maintenance_cost_annual": 150_000.0,
+            "crew_list": [
+                {"rank": "captain", "attribute": "ferry", "team_size": 1},
+                {"rank": "crew", "attribute": "ferry", "team_size": 8},
+            ],
+            "I_energy": 0.5,
+            "EF_CO2": 0.27,
+            "NOxSOx_rate": 0.01,
+            "annual_energy_consumption_kWh": 5_000_000.0,
+        },
+
+        "rv": {
+            "type_vehicle": "Ship",
+        },
+    },
+}
+
+
+def _overlay(base: dict, overrides: dict) -> dict:
+    """
+    New dict with overrides applied on base (nested dicts are merged).
+    Tuple keys are flat paths: {("rv", "type_energy"): "BEV"} == {"rv": {"type_energy": "BEV"}}.
+    """
+    result = dict(base)
+    for key, value in overrides.items():
+        if isinstance(key, tuple):
+            key, value = key[0], (unflatten({key[1:]: value}) if len(key) > 1 else value)
+        if isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = _overlay(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+
+# -------------------- FLAT PATHS --------------------
+
+def unflatten(flat: dict) -> dict:
+    """Nested dict from {path tuple: value}."""
+    inputs = {}
+    for path, value in flat.items():
+        node = inputs
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = value
+    return inputs
+
+
+def build_inputs(asset_type: str, overrides: Optional[dict] = None) -> dict:
+    """
+    Example input dictionary for an asset ("truck" or "ship").
+
+    :param overrides: optional nested dict overlaid on the example (e.g. {"rv": {"type_energy": "BEV"}})
+    """
+    if asset_type not in _ASSET_OVERRIDES:
+        raise ValueError(f"asset_type desconocido: {asset_type}")
+    inputs = _overlay(_base_inputs(), copy.deepcopy(_ASSET_OVERRIDES[asset_type]))
+    if overrides:
+        inputs = _overlay(inputs, copy.deepcopy(overrides))
+    return inputs
+
+
+# -------------------- CACHED (FROZEN) VARIANTS --------------------
+@lru_cache(maxsize=1024)
+def _cached_build(asset_type: str, overrides_key: Any) -> MappingProxyType:
+    return freeze(build_inputs(asset_type, from_key(overrides_key)))
+
+
+def build_frozen_inputs(asset_type: str, overrides: Optional[dict] = None) -> MappingProxyType:
+    """
+    Read-only (see inputs.frozen) version of build_inputs, memoized per
+    (asset_type, overrides) with LRU eviction: sweeps that revisit the same
+    variants get the shared instance back instead of rebuilding it.
+    Use inputs.frozen.thaw() on the result to get an editable copy.
+    """
+    return _cached_build(asset_type, to_key(overrides or {}))
+
+
+# Hit-rate telemetry / reset of the variants cache
+build_frozen_inputs.cache_info = _cached_build.cache_info
+build_frozen_inputs.cache_clear = _cached_build.cache_clear
+
+
+def build_lazy_inputs(asset_type: str, overrides: Optional[dict] = None) -> "LazyInput":
+    """Typed variant whose CAPEX / OPEX / RV sections are built on first access (see LazyInput)."""
+    from inputs.schema import LazyInput
+    return LazyInput(build_frozen_inputs(asset_type, overrides))
+
@@ -1,93 +1,35 @@
-def make_example_truck_inputs():
-    """Ejemplo de diccionario de entrada para un TRUCK."""
-    return {
-        "asset_type": "truck",
-        "description": "Heavy diesel N3 in France",
+from types import MappingProxyType
+from typing import Optional, Union
 
-        # Datos comunes
-        "powertrain_type": "DIESEL",      # para CAPEX / RV (ajusta a tu DB)
-        "vehicle_weight_class": "heavy",
-        "country": "France",
-        "year": 2025,
-        "operation_years": 5,
+from inputs.frozen import thaw
+from inputs.gen_inputs import build_frozen_inputs
+from inputs.schema import TruckInput, from_dict
 
-        # ---------- CAPEX ----------
-        "capex": {
-            "powertrain_type": "DIESEL",
-            "vehicle_number": 1,
-            "vehicle_id": 1,
-            "vehicle_weight_class": "light",
-            "country": "FR",
-            "year": 2025,
 
-            # Vehicle acquisition
-            "is_new": True,
-            "owns_vehicle": False,
-            "purchase_price": 50000.0,
-            "conversion_cost": 0.0,
-            "certification_cost": 0.0,
+__all__ = ["make_example_truck_inputs", "make_example_truck_case"]
 
-            # Infrastructure
-            "n_slow": None,
-            "n_fast": None,
-            "n_ultra": None,
-            "n_stations": 1,
-            "smart_charging_enabled": False,
+# Built once at import time; shared read-only view
+_TRUCK_INPUTS = build_frozen_inputs("truck")
+_TRUCK_CASE = from_dict(TruckInput, _TRUCK_INPUTS)
 
-            # Financing
-            "loan_years": 10,
 
-            # Vehicle charging / energy structure (ONLY place where E_t, S_t, etc. are allowed)
-            "vehicle_dict": {
-                "1": {
-                    "E_t": 0.0,
-                    "S_t": 0.0,
-                    "F_t": 0.0,
-                    "U_t": 0.0,
-                    "Public_t": 0.0,
-                    "Private_t": 1.0
-                }
-            }
-        },
+def make_example_truck_inputs(mutable: bool = False,
+                              overrides: Optional[dict] = None) -> Union[MappingProxyType, dict]:
+    """
+    Ejemplo de entrada para un TRUCK (vista de solo lectura compartida).
 
+    run_tco_scenario / run_tco_sweep / run_tco_batch la aceptan tal cual.
+    mutable=True devuelve una copia independiente (dict/list) para modificarla
+    o asignarla directamente a los puertos de CoSApp.
+    overrides (dict anidado o rutas en tupla, ver gen_inputs._overlay) devuelve
+    la variante en cache de build_frozen_inputs: sin copiar la plantilla.
+    """
+    inputs = build_frozen_inputs("truck", overrides) if overrides else _TRUCK_INPUTS
+    if mutable:
+        return thaw(inputs)
+    return inputs
 
-        # ---------- OPEX TRUCK ----------
-        "opex_truck": {
-            "purchase_cost": 150_000.0,
-            "type_energy": "DIESEL",
-            "size_vehicle": "N3",
-            "registration_country": "France",
-            "annual_distance_travel": 120_000.0,
-            "departure_city": "Paris",
-            "arrival_city": "Marseille",
-            "RV": 45_000.0,
-            "N_years": 5.0,
-            "team_count": 1,
-            "maintenance_cost": 7_000.0,
-            "consumption_energy": 42_000.0,
-            "fuel_multiplier": 1.0,
-            "EF_CO2_diesel": 2.65,
-        },
-
-        # ---------- RV ----------
-        "rv": {
-            "type_vehicle": "truck",
-            "type_energy": "DIESEL",
-            "registration_country": "France",
-            "purchase_cost": 150_000.0,
-            "year_purchase": 2020,
-            "current_year": 2025,
-            "travel_measure": 600_000.0,
-            "maintenance_cost": 7_000.0,
-            "minimum_fuel_consumption": 250.0,
-            "powertrain_model_year" : 2020,
-            "warranty" : 5.0,
-            "type_warranty" : 'years',
-
-            "energy_price": 1.5,
-            "co2_taxes": 500.0,
-            "subsidies":0.0,
-            "vehicle_number": 1,
-        },
-    }
 
+def make_example_truck_case() -> TruckInput:
+    """Mismo ejemplo como dataclass inmutable (TruckInput), compartida."""
+    return _TRUCK_CASE
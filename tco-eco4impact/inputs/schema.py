@@ -0,0 +1,245 @@
+"""
+Typed, immutable versions of the example input dictionaries.
+
+Same fields as the dicts built in gen_truck_in / gen_ship_in, as frozen slotted
+dataclasses: attribute access is a slot load instead of a dict lookup, and the
+instances can be cached and shared safely. Identical sections (CAPEX, OPEX, RV)
+are shared by reference between scenarios built with from_dict (flyweight).
+"""
+import weakref
+from dataclasses import dataclass, field, fields, is_dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+import numpy as np
+
+from inputs.frozen import freeze, thaw, to_key
+from functions.discounting import discount_factors
+
+
+@dataclass(slots=True, frozen=True, weakref_slot=True)
+class CapexInput:
+    powertrain_type: str
+    vehicle_number: int
+    vehicle_id: int
+    vehicle_weight_class: str
+    country: str
+    year: int
+
+    # Vehicle acquisition
+    is_new: bool
+    owns_vehicle: bool
+    purchase_price: float
+    conversion_cost: float
+    certification_cost: float
+
+    # Infrastructure
+    n_slow: Optional[int]
+    n_fast: Optional[int]
+    n_ultra: Optional[int]
+    n_stations: int
+    smart_charging_enabled: bool
+
+    # Financing
+    loan_years: int
+
+    # Vehicle charging / energy structure (read-only view)
+    vehicle_dict: Mapping
+    # Total annual energy of the fleet (sum of E_t), computed at construction
+    fleet_energy_total: float = field(init=False, compare=False)
+
+    def __post_init__(self):
+        total = sum(vdata.get("E_t", 0.0) for vdata in self.vehicle_dict.values())
+        object.__setattr__(self, "fleet_energy_total", float(total))
+
+
+@dataclass(slots=True, frozen=True, weakref_slot=True)
+class OpexTruckInput:
+    purchase_cost: float
+    type_energy: str
+    size_vehicle: str
+    registration_country: str
+    annual_distance_travel: float
+    departure_city: str
+    arrival_city: str
+    RV: float
+    N_years: float
+    team_count: int
+    maintenance_cost: float
+    consumption_energy: float
+    fuel_multiplier: float
+    EF_CO2_diesel: float
+
+
+@dataclass(slots=True, frozen=True, weakref_slot=True)
+class OpexShipInput:
+    country_reg: str
+    country_oper: str
+    ship_class: str
+    length: float
+    energy_type: str
+    purchase_cost: float
+    safety_class: str
+    annual_distance: float
+    n_trips_per_year: float
+    days_per_trip: float
+    planning_horizon_years: float
+    maintenance_cost_annual: float
+    crew_list: tuple
+    I_energy: float
+    EF_CO2: float
+    NOxSOx_rate: float
+    annual_energy_consumption_kWh: float
+
+
+@dataclass(slots=True, frozen=True, weakref_slot=True)
+class RVInput:
+    type_vehicle: str
+    type_energy: str
+    registration_country: str
+    purchase_cost: float
+    year_purchase: int
+    current_year: int
+    travel_measure: float
+    maintenance_cost: float
+    minimum_fuel_consumption: float
+    powertrain_model_year: int
+    warranty: float
+    type_warranty: str
+
+    energy_price: float
+    co2_taxes: float
+    subsidies: float
+    vehicle_number: int
+
+
+@dataclass(slots=True, frozen=True)
+class TruckInput:
+    asset_type: str
+    description: str
+    powertrain_type: str
+    vehicle_weight_class: str
+    country: str
+    year: int
+    operation_years: int
+    discount_rate: float
+    capex: CapexInput
+    opex_truck: OpexTruckInput
+    rv: RVInput
+    # 1/(1+r)^t for t = 1..operation_years, precomputed at construction
+    discount_factors: np.ndarray = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "discount_factors", discount_factors(self.discount_rate, self.operation_years))
+
+
+@dataclass(slots=True, frozen=True)
+class ShipInput:
+    asset_type: str
+    description: str
+    powertrain_type: str
+    vehicle_weight_class: str
+    country: str
+    year: int
+    operation_years: int
+    discount_rate: float
+    capex: CapexInput
+    opex_ship: OpexShipInput
+    rv: RVInput
+    # 1/(1+r)^t for t = 1..operation_years, precomputed at construction
+    discount_factors: np.ndarray = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "discount_factors", discount_factors(self.discount_rate, self.operation_years))
+
+
+# Nested sections of each top-level input
+_SECTIONS = {
+    TruckInput: {"capex": CapexInput, "opex_truck": OpexTruckInput, "rv": RVInput},
+    ShipInput: {"capex": CapexInput, "opex_ship": OpexShipInput, "rv": RVInput},
+}
+
+# Top-level input type of each asset_type
+INPUT_TYPES = {"truck": TruckInput, "ship": ShipInput}
+
+
+# Live section instances by content, so identical sections are built only once
+_SECTION_POOL = weakref.WeakValueDictionary()
+
+
+def _shared_section(cls, data: Mapping):
+    key = (cls, to_key(data))
+    section = _SECTION_POOL.get(key)
+    if section is None:
+        section = from_dict(cls, data)
+        _SECTION_POOL[key] = section
+    return section
+
+
+def from_dict(cls, data: Mapping):
+    """Build a TruckInput / ShipInput (or one of its sections) from an input dict."""
+    sections = _SECTIONS.get(cls, {})
+    kwargs = {}
+    for f in fields(cls):
+        if not f.init:
+            continue
+        value = data[f.name]
+        if f.name in sections:
+            value = _shared_section(sections[f.name], value)
+        elif isinstance(value, (dict, list)):
+            value = freeze(value)
+        kwargs[f.name] = value
+    return cls(**kwargs)
+
+
+def to_dict(inputs) -> dict:
+    """Plain (mutable) nested dict with the same layout as the example inputs."""
+    result = {}
+    for f in fields(inputs):
+        if not f.init:
+            continue
+        value = getattr(inputs, f.name)
+        if is_dataclass(value):
+            value = to_dict(value)
+        elif isinstance(value, (MappingProxyType, tuple)):
+            value = thaw(value)
+        result[f.name] = value
+    return result
+
+
+class LazyInput:
+    """
+    Top-level input (same attributes as TruckInput / ShipInput) whose sections
+    are converted to dataclasses only on first access, then cached.
+
+    Useful for sweeps that evaluate one sub-model at a time: an RV-only run
+    never builds the CAPEX / OPEX sections.
+    """
+
+    def __init__(self, data: Mapping):
+        asset_type = data["asset_type"]
+        if asset_type not in INPUT_TYPES:
+            raise ValueError(f"asset_type desconocido: {asset_type}")
+        self._data = data
+        self._type = INPUT_TYPES[asset_type]
+
+    def __getattr__(self, name):
+        # Only called for attributes not built yet
+        data = self.__dict__.get("_data")
+        if data is None or name not in data:
+            raise AttributeError(name)
+        sections = _SECTIONS[self._type]
+        if name in sections:
+            value = _shared_section(sections[name], data[name])
+        else:
+            value = freeze(data[name]) if isinstance(data[name], (dict, list)) else data[name]
+        self.__dict__[name] = value
+        return value
+
+    @property
+    def discount_factors(self) -> np.ndarray:
+        return discount_factors(self.discount_rate, self.operation_years)
+
+    def materialize(self):
+        """Full TruckInput / ShipInput with every section built."""
+        return from_dict(self._type, self._data)
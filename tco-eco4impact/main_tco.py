@@ -14,207 +14,559 @@ Main TCO orchestrator for Eco4Impact / BoatTwin project.
     CAPEX, OPEX, RV y un ejemplo de TCO_total.
 """
 
-from cosapp.drivers import RunOnce
-
-# 🔹 CAMBIO: ahora importamos ambos desde el MISMO archivo
-from functions.opex_calculator import TruckOPEXCalculator, ShipOPEXCalculator
-
-from functions.rv_calculator import ResidualValueCalculator
-from functions.capex_calculator import VehicleCAPEXCalculator
+import os
+import threading
+import weakref
+from collections.abc import Mapping
+from dataclasses import dataclass, fields, is_dataclass
+from operator import attrgetter, itemgetter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from types import MappingProxyType
+
+import numpy as np
+
+# The CoSApp systems (CAPEX, OPEX, RV) are imported by the factories below, when
+# the first system is built: importing main_tco does not load CoSApp (~1.4 s),
+# e.g. in the parent process of run_tco_batch or for the input helpers only
+from functions.discounting import annuity_factors, discount_sum
+from models.enums import AssetType
 from inputs.gen_truck_in import make_example_truck_inputs
 from inputs.gen_ship_in import make_example_ship_inputs
+from inputs.frozen import thaw, to_key
+from inputs.schema import LazyInput, to_dict
+
+try:
+    from joblib import Parallel, delayed
+except ImportError:  # optional dependency
+    Parallel = None
+
+try:
+    import numexpr
+except ImportError:  # optional dependency
+    numexpr = None
 
 # ----------------------------------------------------------------------
 # 2. WRAPPERS FOR EACH MODULE
 # ----------------------------------------------------------------------
-def run_capex(capex_inputs: dict) -> float:
-    capex_inputs = capex_inputs.get("capex", {})
+# Report separators, built once; each verbose report is written with one print
+_RULE = "=" * 80
+_THIN_RULE = "-" * 80
+
+# Systems reused across scenarios (sweeps): CoSApp setup and driver paid once.
+# One cache per thread: concurrent callers never share a system (no locking needed)
+_SYSTEM_CACHE = threading.local()
+
+
+def _cached_system(key: tuple, factory, driver_name: str):
+    """System of key, built with its RunOnce driver on first use in this thread and reused afterwards."""
+    systems = getattr(_SYSTEM_CACHE, "systems", None)
+    if systems is None:
+        systems = _SYSTEM_CACHE.systems = {}
+    system = systems.get(key)
+    if system is None:
+        system = systems[key] = factory()
+        _ensure_driver(system, driver_name)
+    return system
+
+
+def _ensure_driver(system, name: str):
+    """RunOnce driver name of system, added only if the system does not have it yet."""
+    driver = system.drivers.get(name)
+    if driver is None:
+        from cosapp.drivers import RunOnce
+
+        driver = system.add_driver(RunOnce(name))
+    return driver
+
+
+def _new_capex_system():
+    from functions.capex_calculator import VehicleCAPEXCalculator
+    return VehicleCAPEXCalculator("capex_global")
 
-    sys_capex = VehicleCAPEXCalculator("capex_global")
 
+def _new_opex_truck_system():
+    # 🔹 CAMBIO: ambos sistemas OPEX vienen del MISMO archivo
+    from functions.Opex_Calculator import TruckOPEXCalculator
+    return TruckOPEXCalculator("opex_truck")
+
+
+def _new_opex_ship_system():
+    from functions.Opex_Calculator import ShipOPEXCalculator
+    return ShipOPEXCalculator("ship_opex_case")
+
+
+def _new_rv_system():
+    from functions.rv_calculator import ResidualValueCalculator
+    return ResidualValueCalculator("rv_global")
+
+
+def forward_eval(system) -> None:
+    """
+    Evaluate a system without going through its drivers.
+
+    Valid for acyclic, purely forward models only (every CAPEX / OPEX / RV system
+    here): a leaf system runs its setup_run hook, compute() and clean_run hook,
+    which skips the driver machinery (master setup, loop opening, traversal,
+    logging). Systems with children fall back to run_drivers(), which also
+    transfers the values along their connections.
+    """
+    if system.children:
+        system.run_drivers()
+        return
+    system.setup_run()
+    system.compute()
+    system.clean_run()
+
+
+@dataclass(slots=True, frozen=True)
+class CapexResult:
+    """CAPEX of one run: annualized per vehicle (capex_total * crf), total, CRF and the components of the total."""
+    capex_per_year: float
+    capex_total: float
+    crf: float
+    vehicle_cost: float
+    infrastructure_cost: float
+    taxes: float
+    financing_cost: float
+    subsidies: float
+
+
+# Outwards of VehicleCAPEXCalculator read into a CapexResult (same order as its fields)
+_CAPEX_RESULT = attrgetter("c_capex_per_vehicle", "c_capex_total", "c_crf", "c_vehicle_cost",
+                           "c_infrastructure_cost", "c_taxes", "c_financing_cost", "c_subsidies")
+
+# (in_vehicle_properties variable, key in the CAPEX section, default)
+_CAPEX_FIELDS = (
     # -------------------- MAIN USER INPUTS --------------------
-    sys_capex.in_vehicle_properties.type_vehicle      = capex_inputs.get("powertrain_type", "diesel")
-    sys_capex.in_vehicle_properties.vehicle_number       = capex_inputs.get("vehicle_number", 1)
-    sys_capex.in_vehicle_properties.vehicle_id           = capex_inputs.get("vehicle_id", 1)
-    sys_capex.in_vehicle_properties.vehicle_weight_class = capex_inputs.get("vehicle_weight_class", "light")
-    sys_capex.in_vehicle_properties.country              = capex_inputs.get("country", "FR")
-    sys_capex.in_vehicle_properties.year                 = capex_inputs.get("year", 2025)
+    ("type_vehicle",           "powertrain_type",        "diesel"),
+    ("vehicle_number",         "vehicle_number",         1),
+    ("vehicle_id",             "vehicle_id",             1),
+    ("vehicle_weight_class",   "vehicle_weight_class",   "light"),
+    ("country",                "country",                "FR"),
+    ("year",                   "year",                   2025),
 
     # -------------------- VEHICLE ACQUISITION --------------------
-    sys_capex.in_vehicle_properties.is_new             = capex_inputs.get("is_new", True)
-    sys_capex.in_vehicle_properties.owns_vehicle       = capex_inputs.get("owns_vehicle", False)
-    sys_capex.in_vehicle_properties.purchase_cost     = capex_inputs.get("purchase_price", 0.0)
-    sys_capex.in_vehicle_properties.conversion_cost    = capex_inputs.get("conversion_cost", 0.0)
-    sys_capex.in_vehicle_properties.certification_cost = capex_inputs.get("certification_cost", 0.0)
-    sys_capex.in_vehicle_properties.vehicle_dict       = capex_inputs.get("vehicle_dict", {})
+    ("is_new",                 "is_new",                 True),
+    ("owns_vehicle",           "owns_vehicle",           False),
+    ("purchase_cost",          "purchase_price",         0.0),
+    ("conversion_cost",        "conversion_cost",        0.0),
+    ("certification_cost",     "certification_cost",     0.0),
+    ("vehicle_dict",           "vehicle_dict",           {}),
 
     # -------------------- INFRASTRUCTURE --------------------
-    sys_capex.in_vehicle_properties.n_slow                 = capex_inputs.get("n_slow")
-    sys_capex.in_vehicle_properties.n_fast                 = capex_inputs.get("n_fast")
-    sys_capex.in_vehicle_properties.n_ultra                = capex_inputs.get("n_ultra")
-    sys_capex.in_vehicle_properties.n_stations             = capex_inputs.get("n_stations", 0)
-    sys_capex.in_vehicle_properties.smart_charging_enabled = capex_inputs.get("smart_charging_enabled", False)
+    ("n_slow",                 "n_slow",                 None),
+    ("n_fast",                 "n_fast",                 None),
+    ("n_ultra",                "n_ultra",                None),
+    ("n_stations",             "n_stations",             0),
+    ("smart_charging_enabled", "smart_charging_enabled", False),
 
     # -------------------- FINANCING --------------------
-    sys_capex.in_vehicle_properties.loan_years = capex_inputs.get("loan_years", 10)
+    ("loan_years",             "loan_years",             10),
+)
 
-    sys_capex.add_driver(RunOnce("run_capex"))
-    sys_capex.run_drivers()
 
-    return sys_capex.c_capex_per_vehicle
+def run_capex(capex_inputs: dict) -> CapexResult:
+    capex_inputs = capex_inputs.get("capex", {})
+
+    # Every input below is assigned on each run: one system for all scenarios
+    sys_capex = _cached_system(("capex",), _new_capex_system, "run_capex")
+
+    vehicle_properties = sys_capex.in_vehicle_properties
+    for name, key, default in _CAPEX_FIELDS:
+        setattr(vehicle_properties, name, capex_inputs.get(key, default))
+
+    forward_eval(sys_capex)
+
+    return CapexResult(*_CAPEX_RESULT(sys_capex))
+
+
+# Inward names of each OPEX system class, read once from the first instance
+_INWARD_NAMES = {}
+
+
+def _assign_inwards(system, inputs: dict) -> None:
+    """Set the inputs that are inwards of system (other keys are ignored)."""
+    names = _INWARD_NAMES.get(type(system))
+    if names is None:
+        names = _INWARD_NAMES[type(system)] = frozenset(system.inwards)
+    # One set intersection instead of a membership test per input key
+    for key in inputs.keys() & names:
+        setattr(system, key, inputs[key])
 
 
 # -------------------- OPEX TRUCK --------------------
-def run_opex_truck(opex_inputs: dict) -> float:
+def run_opex_truck(opex_inputs: dict, verbose: bool = False) -> float:
     # 🔹 Ahora usamos el sistema unificado, sin pasar db_path (lo resuelve dentro)
-    sys_opex = TruckOPEXCalculator("opex_truck")
+    # Keyed by the input names: inwards not given keep their setup defaults
+    sys_opex = _cached_system(("opex_truck", frozenset(opex_inputs)),
+                              _new_opex_truck_system, "run_truck")
 
     # Asignar inputs si existen como atributos del sistema
-    for key, value in opex_inputs.items():
-        if hasattr(sys_opex, key):
-            setattr(sys_opex, key, value)
+    _assign_inwards(sys_opex, opex_inputs)
 
-    # sys_opex.print_input_summary()
-    sys_opex.add_driver(RunOnce("run_truck"))
-    sys_opex.run_drivers()
-    sys_opex.print_results()
+    forward_eval(sys_opex)
+    if verbose:
+        sys_opex.print_results()
 
     return sys_opex.o_opex_total
 
 
 # -------------------- OPEX SHIP --------------------
-def run_opex_ship(opex_inputs: dict) -> float:
+def run_opex_ship(opex_inputs: dict, verbose: bool = False) -> float:
     # 🔹 Igual: sistema unificado, sin db_path, usa db_ships internamente
-    sys_ship = ShipOPEXCalculator("ship_opex_case")
+    sys_ship = _cached_system(("opex_ship", frozenset(opex_inputs)),
+                              _new_opex_ship_system, "run_ship")
 
-    for key, value in opex_inputs.items():
-        if hasattr(sys_ship, key):
-            setattr(sys_ship, key, value)
+    _assign_inwards(sys_ship, opex_inputs)
 
-    driver = sys_ship.add_driver(RunOnce("run_ship"))
-    sys_ship.run_drivers()
+    forward_eval(sys_ship)
 
-    print("\n--- SHIP OPEX RESULTS ---")
-    print(f"O_taxes:       {sys_ship.o_taxes:.2f} €")
-    print(f"O_ports:       {sys_ship.o_ports:.2f} €")
-    print(f"O_insurance:   {sys_ship.o_insurance:.2f} €")
-    print(f"O_crew:        {sys_ship.o_crew:.2f} €")
-    print(f"O_maintenance: {sys_ship.o_maintenance:.2f} €")
-    print(f"O_energy:      {sys_ship.o_energy:.2f} €")
-    print(f"OPEX_total:    {sys_ship.o_opex_total:.2f} €")
+    if verbose:
+        print(f"\n--- SHIP OPEX RESULTS ---\n"
+              f"O_taxes:       {sys_ship.o_taxes:.2f} €\n"
+              f"O_ports:       {sys_ship.o_ports:.2f} €\n"
+              f"O_insurance:   {sys_ship.o_insurance:.2f} €\n"
+              f"O_crew:        {sys_ship.o_crew:.2f} €\n"
+              f"O_maintenance: {sys_ship.o_maintenance:.2f} €\n"
+              f"O_energy:      {sys_ship.o_energy:.2f} €\n"
+              f"OPEX_total:    {sys_ship.o_opex_total:.2f} €")
 
     return sys_ship.o_opex_total
 
 
-def run_rv(rv_inputs: dict) -> float:
-    rv_sys = ResidualValueCalculator("rv_global")
-    print("Hello World from RV Calculator!")
-    # Vehicle properties
-    rv_sys.in_vehicle_properties.type_vehicle = rv_inputs["type_vehicle"]
-    rv_sys.in_vehicle_properties.type_energy = rv_inputs["type_energy"]
-    rv_sys.in_vehicle_properties.registration_country = rv_inputs["registration_country"]
-    rv_sys.in_vehicle_properties.purchase_cost = rv_inputs["purchase_cost"]
-    rv_sys.in_vehicle_properties.year_purchase = rv_inputs["year_purchase"]
-    rv_sys.in_vehicle_properties.current_year = rv_inputs["current_year"]
-    rv_sys.in_vehicle_properties.travel_measure = rv_inputs["travel_measure"]
-    rv_sys.in_vehicle_properties.maintenance_cost = rv_inputs["maintenance_cost"]
-    rv_sys.in_vehicle_properties.minimum_fuel_consumption = rv_inputs["minimum_fuel_consumption"]
-    rv_sys.in_vehicle_properties.powertrain_model_year = rv_inputs["powertrain_model_year"]
-    rv_sys.in_vehicle_properties.warranty = rv_inputs["warranty"]
-    rv_sys.in_vehicle_properties.type_warranty = rv_inputs["type_warranty"]
-    
-    # Country properties
-    rv_sys.in_country_properties.energy_price = rv_inputs["energy_price"]
-    rv_sys.in_country_properties.c02_taxes = rv_inputs["co2_taxes"]
-    rv_sys.in_country_properties.subsidies = rv_inputs["subsidies"]
-
-    rv_sys.add_driver(RunOnce('run_rv'))
-    rv_sys.run_drivers()
-
-    print("\n--- RV RESULTS ---")
-    print("\n" + "-"*80)
-    print("DEPRECIATION")
-    print(f"Total Depreciation Value: ${rv_sys.total_depreciation:,.2f}")
-    
-    print("\n" + "-"*80)
-    print("IMPACT HEALTH PENALTIES")
-    print(f"  Total Impact Health: ${rv_sys.total_impact_health:,.2f}")
-    
-    print("\n" + "-"*80)
-    print("EXTERNAL FACTORS")
-    print(f"External Factors Adjustment: ${rv_sys.total_external_factors:,.2f}")
-    
-    print("\n" + "="*80)
-    print(f"FINAL RESIDUAL VALUE: ${rv_sys.rv:,.2f}")
-    print("="*80)
+# Vehicle inputs of the "rv" section passed to the RV
+_RV_VEHICLE_INPUTS = (
+    "type_vehicle", "type_energy", "registration_country", "purchase_cost", "year_purchase",
+    "current_year", "travel_measure", "maintenance_cost", "minimum_fuel_consumption",
+    "powertrain_model_year", "warranty", "type_warranty",
+)
+# (in_country_properties variable, key of the "rv" section)
+_RV_COUNTRY_FIELDS = (("energy_price", "energy_price"), ("c02_taxes", "co2_taxes"), ("subsidies", "subsidies"))
+_RV_COUNTRY_VARIABLES = tuple(name for name, _ in _RV_COUNTRY_FIELDS)
+
+# Every input read by run_rv, in one C-level call: vehicle values, then country values
+_RV_GETTER = itemgetter(*_RV_VEHICLE_INPUTS, *(key for _, key in _RV_COUNTRY_FIELDS))
+_N_RV_VEHICLE_INPUTS = len(_RV_VEHICLE_INPUTS)
+
+
+def run_rv(rv_inputs: dict, verbose: bool = False) -> float:
+    values = _RV_GETTER(rv_inputs)
+    vehicle_values = values[:_N_RV_VEHICLE_INPUTS]
+    if rv_inputs.get("rv_fast"):
+        # Same RV without building / running a CoSApp system (sweeps)
+        from functions.rv_fast import compute_rv, rv_vehicle_inputs, RVCountryInputs
+
+        results = compute_rv(rv_vehicle_inputs(dict(zip(_RV_VEHICLE_INPUTS, vehicle_values))),
+                             RVCountryInputs(*values[_N_RV_VEHICLE_INPUTS:]))
+        if verbose:
+            _print_rv_results(results)
+        return results.rv
+
+    # type_vehicle, type_energy: first two vehicle inputs
+    rv_sys = _cached_system(("rv", vehicle_values[0], vehicle_values[1]), _new_rv_system, "run_rv")
+    # Ports looked up once, then one tight loop each
+    vp = rv_sys.in_vehicle_properties
+    for name, value in zip(_RV_VEHICLE_INPUTS, vehicle_values):
+        setattr(vp, name, value)
+
+    cp = rv_sys.in_country_properties
+    for name, value in zip(_RV_COUNTRY_VARIABLES, values[_N_RV_VEHICLE_INPUTS:]):
+        setattr(cp, name, value)
+
+    forward_eval(rv_sys)
+    if verbose:
+        _print_rv_results(rv_sys)
 
     return rv_sys.rv
 
 
+def _print_rv_results(rv_sys) -> None:
+    # rv_sys: ResidualValueCalculator or RVOutputs (same output names)
+    print(f"\n--- RV RESULTS ---\n"
+          f"\n{_THIN_RULE}\n"
+          f"DEPRECIATION\n"
+          f"Total Depreciation Value: ${rv_sys.total_depreciation:,.2f}\n"
+          f"\n{_THIN_RULE}\n"
+          f"IMPACT HEALTH PENALTIES\n"
+          f"  Total Impact Health: ${rv_sys.total_impact_health:,.2f}\n"
+          f"\n{_THIN_RULE}\n"
+          f"EXTERNAL FACTORS\n"
+          f"External Factors Adjustment: ${rv_sys.total_external_factors:,.2f}\n"
+          f"\n{_RULE}\n"
+          f"FINAL RESIDUAL VALUE: ${rv_sys.rv:,.2f}\n"
+          f"{_RULE}")
+
+
 # ----------------------------------------------------------------------
 # 3. FUNCIÓN GLOBAL: RUN_TCO_SCENARIO
 # ----------------------------------------------------------------------
-def run_tco_scenario(user_inputs: dict):
+def _capex_inputs(user_inputs: dict) -> dict:
+    """CAPEX section completed with the common fields of the scenario (one dict merge)."""
+    return {
+        **user_inputs["capex"],
+        "powertrain_type": user_inputs["powertrain_type"],
+        "vehicle_weight_class": user_inputs["vehicle_weight_class"],
+        "country": user_inputs["country"],
+        "year": user_inputs["year"],
+    }
+
+
+# Plain dict of each typed section (CapexInput, OpexTruckInput, ...): sections are
+# shared between scenarios (inputs.schema flyweights), so each is converted once.
+# Keyed by id (sections hold read-only mappings, not hashable), entry dropped with the section
+_SECTION_DICTS = {}
+
+
+def _section_dict(section) -> dict:
+    key = id(section)
+    entry = _SECTION_DICTS.get(key)
+    if entry is None:
+        entry = _SECTION_DICTS[key] = (weakref.ref(section, lambda _, key=key: _SECTION_DICTS.pop(key, None)),
+                                       to_dict(section))
+    return entry[1]
+
+
+def _scenario_inputs(user_inputs):
+    """
+    user_inputs as the dict read by the wrappers: dicts are returned as they are,
+    read-only inputs (inputs.frozen, e.g. make_example_*_inputs()) are thawed so the
+    CoSApp ports get real dicts and lists, and TruckInput / ShipInput (inputs.schema)
+    get their fields by attribute and their sections from _SECTION_DICTS. A LazyInput
+    is materialized first: a scenario reads every section.
+    """
+    if isinstance(user_inputs, MappingProxyType):
+        return thaw(user_inputs)
+    if isinstance(user_inputs, LazyInput):
+        user_inputs = user_inputs.materialize()
+    if isinstance(user_inputs, Mapping) or not is_dataclass(user_inputs):
+        return user_inputs
+    scenario = {}
+    for f in fields(user_inputs):
+        if not f.init:
+            continue
+        value = getattr(user_inputs, f.name)
+        if is_dataclass(value):
+            value = _section_dict(value)
+        scenario[f.name] = value
+    return scenario
+
+
+# OPEX of each asset type: (run_opex function, OPEX section of user_inputs).
+# New asset types only need an entry here
+_OPEX_DISPATCH = {
+    AssetType.TRUCK: (run_opex_truck, "opex_truck"),
+    AssetType.SHIP: (run_opex_ship, "opex_ship"),
+}
+
+
+def _opex_step(user_inputs: dict) -> tuple:
+    """(run_opex function, OPEX section) of the asset type of the scenario."""
+    asset_type = user_inputs["asset_type"]
+    try:
+        run_opex, section = _OPEX_DISPATCH[AssetType.parse(asset_type)]
+    except KeyError:
+        raise ValueError(f"asset_type desconocido: {asset_type}") from None
+    return run_opex, user_inputs[section]
+
+
+@dataclass(slots=True, frozen=True)
+class TCOResult(Mapping):
+    """
+    Result of one TCO scenario (annual CAPEX and OPEX, residual value, TCO over the horizon).
+
+    Also a read-only mapping, like the dict run_tco_scenario used to return:
+    result["tco_total"], "rv" in result, result.get(...), result.items(), dict(result).
+    """
+    capex_per_year: float
+    opex_per_year: float
+    rv: float
+    tco_total: float
+
+    def __getitem__(self, name: str) -> float:
+        if name not in self.__slots__:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+
+def run_tco_scenario(user_inputs: dict, verbose: bool = False, concurrent: bool = False) -> TCOResult:
+    """
+    CAPEX, OPEX, RV and TCO of one scenario.
+
+    :param user_inputs: input dict (see inputs.gen_inputs), read-only example inputs,
+                        typed TruckInput / ShipInput or LazyInput
+    :param verbose: print the report of each module and the TCO summary
+                    (off by default: sweeps only need the returned TCOResult)
+    :param concurrent: run CAPEX, OPEX and RV (independent inputs, one cached system
+                       each) in a thread pool. Only hides latency of a scenario on a
+                       request path: the CoSApp computes hold the GIL, so it is not
+                       faster in a loop. Ignored when verbose (reports would interleave).
+    """
+    user_inputs = _scenario_inputs(user_inputs)
     asset_type = user_inputs["asset_type"]
-    print("\n" + "=" * 80)
-    print(f"RUNNING GLOBAL TCO SCENARIO: {user_inputs.get('description', '')}")
-    print("=" * 80)
-    print(f"Asset type: {asset_type}")
+    if verbose:
+        print(f"\n{_RULE}\n"
+              f"RUNNING GLOBAL TCO SCENARIO: {user_inputs.get('description', '')}\n"
+              f"{_RULE}\n"
+              f"Asset type: {asset_type}")
 
     # 1) CAPEX
-    capex_inputs = dict(user_inputs["capex"])
-    capex_inputs["powertrain_type"] = user_inputs["powertrain_type"]
-    capex_inputs["vehicle_weight_class"] = user_inputs["vehicle_weight_class"]
-    capex_inputs["country"] = user_inputs["country"]
-    capex_inputs["year"] = user_inputs["year"]
-
-    capex_per_year = run_capex(capex_inputs)
-    print(f"\n[CAPEX] CAPEX per vehicle: {capex_per_year:,.2f} €")
+    capex_inputs = _capex_inputs(user_inputs)
 
     # 2) OPEX
-    if asset_type == "truck":
-        opex_total = run_opex_truck(user_inputs["opex_truck"])
-    elif asset_type == "ship":
-        opex_total = run_opex_ship(user_inputs["opex_ship"])
+    run_opex, opex_inputs = _opex_step(user_inputs)
+
+    if concurrent and not verbose:
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix="tco") as pool:
+            f_capex = pool.submit(run_capex, capex_inputs)
+            f_opex = pool.submit(run_opex, opex_inputs)
+            f_rv = pool.submit(run_rv, user_inputs["rv"])
+            capex_per_year, opex_total, rv_value = f_capex.result().capex_per_year, f_opex.result(), f_rv.result()
     else:
-        raise ValueError(f"asset_type desconocido: {asset_type}")
-    print(f"[OPEX] OPEX annual: {opex_total:,.2f} €")
+        capex_per_year = run_capex(capex_inputs).capex_per_year
+        if verbose:
+            print(f"\n[CAPEX] CAPEX per vehicle: {capex_per_year:,.2f} €")
 
-    # 3) RV
-    rv_value = run_rv(user_inputs["rv"])
-    print(f"[RV]: {rv_value:,.2f} €")
+        opex_total = run_opex(opex_inputs, verbose)
+        if verbose:
+            print(f"[OPEX] OPEX annual: {opex_total:,.2f} €")
+
+        # 3) RV
+        rv_value = run_rv(user_inputs["rv"], verbose)
+        if verbose:
+            print(f"[RV]: {rv_value:,.2f} €")
 
     N = user_inputs["operation_years"]
-    tco = capex_per_year * N + opex_total * N - rv_value
+    # OPEX discounted per year: sum_t OPEX / (1+r)^t (r = 0 -> OPEX * N)
+    opex_acc = float(opex_total * discount_sum(user_inputs.get("discount_rate", 0.0), N))
+    tco = capex_per_year * N + opex_acc - rv_value
     # tco = capex_per_year * N  * N - rv_value
 
-    print("\n" + "=" * 80)
-    print("TCO SUMMARY")
-    print("=" * 80)
-    print(f"Horizon: {N} años")
-    print(f"CAPEX acumulated: {capex_per_year * N:,.2f} €")
-    print(f"OPEX acumulated: {opex_total * N:,.2f} €")
-    print(f"Residual Value: {rv_value:,.2f} €")
-    print("-" * 80)
-    print(f"TCO total: {tco:,.2f} €")
-    print("=" * 80)
+    if verbose:
+        print(f"\n{_RULE}\n"
+              f"TCO SUMMARY\n"
+              f"{_RULE}\n"
+              f"Horizon: {N} años\n"
+              f"CAPEX acumulated: {capex_per_year * N:,.2f} €\n"
+              f"OPEX acumulated: {opex_acc:,.2f} €\n"
+              f"Residual Value: {rv_value:,.2f} €\n"
+              f"{_THIN_RULE}\n"
+              f"TCO total: {tco:,.2f} €\n"
+              f"{_RULE}")
+
+    return TCOResult(capex_per_year, opex_total, rv_value, tco)
+
+
+# ----------------------------------------------------------------------
+# 4. BATCH OF SCENARIOS (PARALLEL)
+# ----------------------------------------------------------------------
+def run_tco_batch(scenarios, n_jobs: int = -1, as_arrays: bool = False):
+    """
+    Run independent TCO scenarios across CPU cores (one process per worker).
+
+    Uses joblib (loky backend) when it is installed, concurrent.futures otherwise.
+    Results come back in the order of scenarios (run_tco_scenario is quiet by default).
+    Scenarios are sent to the workers in chunks (~4 per worker), not one by one.
+
+    :param scenarios: iterable of user_inputs in any form accepted by run_tco_scenario
+                      (converted to plain dicts by _scenario_inputs to be sent to the workers)
+    :param n_jobs: number of worker processes, -1 for all cores, 1 to run in this process
+    :param as_arrays: return {TCOResult field: 1-D array} instead of the list of TCOResult
+    :return: list of run_tco_scenario results (or their arrays)
+    """
+    scenarios = [_scenario_inputs(s) for s in scenarios]
+    if n_jobs == 1:
+        results = [run_tco_scenario(s) for s in scenarios]
+    elif Parallel is not None:
+        results = Parallel(n_jobs=n_jobs, backend="loky")(delayed(run_tco_scenario)(s) for s in scenarios)
+    else:
+        workers = (os.cpu_count() or 1) if n_jobs < 0 else n_jobs
+        chunksize = max(1, len(scenarios) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_tco_scenario, scenarios, chunksize=chunksize))
+    return _stack_results(results) if as_arrays else results
+
+
+def _stack_results(results: list) -> dict:
+    """{TCOResult field: 1-D array} of a list of run_tco_scenario results."""
+    return {name: np.fromiter(map(attrgetter(name), results), dtype=float, count=len(results))
+            for name in TCOResult.__slots__}
+
+
+def run_tco_sweep(scenarios) -> dict:
+    """
+    TCO of a batch of scenarios in this process, as NumPy arrays.
+
+    The modules run in one loop over the scenarios (cached systems); the TCO is
+    then one array expression for the whole batch instead of one per scenario:
+    tco = capex * N + opex * sum_t 1/(1+r)^t - rv.
+    CAPEX is evaluated once per distinct CAPEX section: sweeps over OPEX / RV
+    inputs reuse it.
+
+    :param scenarios: sequence of user_inputs in any form accepted by run_tco_scenario
+    :return: dict of 1-D arrays: capex_per_year, opex_per_year, rv, tco_total (the TCOResult
+             fields) and operation_years
+    """
+    n = len(scenarios)
+    capex = np.empty(n)
+    opex = np.empty(n)
+    rv = np.empty(n)
+    N = np.empty(n, dtype=np.int32)
+    discount_rate = np.empty(n)
+    capex_by_inputs = {}
+    for i, user_inputs in enumerate(map(_scenario_inputs, scenarios)):
+        run_opex, opex_inputs = _opex_step(user_inputs)
+        capex_inputs = _capex_inputs(user_inputs)
+        capex_key = to_key(capex_inputs)
+        capex_value = capex_by_inputs.get(capex_key)
+        if capex_value is None:
+            capex_value = capex_by_inputs[capex_key] = run_capex(capex_inputs).capex_per_year
+        capex[i] = capex_value
+        opex[i] = run_opex(opex_inputs)
+        rv[i] = run_rv(user_inputs["rv"])
+        N[i] = user_inputs["operation_years"]
+        discount_rate[i] = user_inputs.get("discount_rate", 0.0)
+    # OPEX discounting of every scenario in one closed-form array expression
+    annuity = annuity_factors(discount_rate, N)
 
     return {
-        "capex_per_year": capex_per_year,
-        "opex_per_year": opex_total,
-        "rv": rv_value,
-        "tco_total": tco,
+        "capex_per_year": capex,
+        "opex_per_year": opex,
+        "rv": rv,
+        "tco_total": _tco_totals(capex, opex, rv, N, annuity),
+        "operation_years": N,
     }
 
 
+def _tco_totals(capex, opex, rv, N, annuity) -> np.ndarray:
+    """
+    tco = capex * N + opex * annuity - rv over scenario arrays: one fused (multi-threaded)
+    pass with numexpr when it is installed, else ufuncs writing into one buffer (annuity is
+    overwritten).
+    """
+    if numexpr is not None:
+        return numexpr.evaluate("capex * N + opex * annuity - rv",
+                                local_dict={"capex": capex, "N": N, "opex": opex, "annuity": annuity, "rv": rv})
+    tco = np.multiply(capex, N)
+    np.multiply(opex, annuity, out=annuity)
+    np.add(tco, annuity, out=tco)
+    np.subtract(tco, rv, out=tco)
+    return tco
+
+
 # ----------------------------------------------------------------------
-# 4. MAIN
+# 5. MAIN
 # ----------------------------------------------------------------------
 if __name__ == "__main__":
     # Escenario TRUCK
     truck_inputs = make_example_truck_inputs()
-    run_tco_scenario(truck_inputs)
+    run_tco_scenario(truck_inputs, verbose=True)
 
     # Escenario SHIP
     ship_inputs = make_example_ship_inputs()
-    run_tco_scenario(ship_inputs)
+    run_tco_scenario(ship_inputs, verbose=True)
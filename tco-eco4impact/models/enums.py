@@ -0,0 +1,39 @@
+from enum import IntEnum
+
+
+class AssetType(IntEnum):
+    '''Type of asset of a TCO scenario.'''
+    TRUCK = 0
+    SHIP = 1
+
+    @classmethod
+    def parse(cls, value):
+        '''AssetType of a user value ('truck', 'Ship', AssetType.SHIP...), None if unknown.'''
+        if isinstance(value, cls):
+            return value
+        return _ASSET_TYPES.get(str(value).strip().lower())
+
+
+class WarrantyType(IntEnum):
+    '''Unit of the vehicle warranty.'''
+    YEARS = 0
+    KM = 1
+
+    @classmethod
+    def parse(cls, value):
+        '''WarrantyType of a user value ('year', 'years', 'km'...), None if unknown.'''
+        if isinstance(value, cls):
+            return value
+        return _WARRANTY_TYPES.get(str(value).strip().lower())
+
+
+class EnergyCategory(IntEnum):
+    '''Efficiency branch of an energy type (RV impact health), as a small int code.'''
+    ICE = 0
+    ELECTRIC = 1
+    HYBRID = 2
+    OTHER = 3
+
+
+_ASSET_TYPES = {"truck": AssetType.TRUCK, "ship": AssetType.SHIP}
+_WARRANTY_TYPES = {"year": WarrantyType.YEARS, "years": WarrantyType.YEARS, "km": WarrantyType.KM}
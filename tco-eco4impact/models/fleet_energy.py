@@ -0,0 +1,154 @@
+from dataclasses import dataclass, field
+from typing import NamedTuple
+import numpy as np
+
+
+# Bits of FleetEnergy.streams: energy streams carrying non-zero energy
+STREAM_SLOW = 1
+STREAM_FAST = 2
+STREAM_ULTRA = 4
+STREAM_PRIVATE = 8
+
+_STREAM_COLUMNS = (('S_frac', STREAM_SLOW), ('F_frac', STREAM_FAST),
+                   ('U_frac', STREAM_ULTRA), ('P_frac', STREAM_PRIVATE))
+
+
+class FleetEntry(NamedTuple):
+    '''Energy data of one vehicle: annual energy and charger / private station shares.'''
+    E_t: float
+    S: float = 0.0
+    F: float = 0.0
+    U: float = 0.0
+    P: float = 0.0
+
+
+@dataclass
+class FleetEnergy:
+    '''
+    Fleet energy data as struct-of-arrays (one entry per vehicle).
+
+    Same content as the CAPEX `vehicle_dict` ({vehicle_id: {'E_t', 'Private_S_t',
+    'Private_F_t', 'Private_U_t', 'Private_t'}}), stored as contiguous arrays so
+    fleet totals are a single multiply-reduce instead of a dict walk.
+
+    Vehicles are identified by integer ids (vehicle_ids, int32). When the ids are
+    1..n in order, vehicle i is row i-1 and no id lookup is needed. Non-integer
+    keys of a vehicle_dict get id -1: they count in the totals but cannot be
+    selected by vehicle_id.
+
+    dtype sets the storage precision of the arrays: float32 halves the memory
+    and bandwidth of large fleets / sweeps; totals are still returned as float.
+
+    streams is a bitmask (STREAM_*) of the streams with some energy: the totals
+    skip the all-zero ones (e.g. the example vehicle_dict, only Private_t = 1.0).
+    '''
+    vehicle_ids: np.ndarray
+    E_t: np.ndarray
+    S_frac: np.ndarray
+    F_frac: np.ndarray
+    U_frac: np.ndarray
+    P_frac: np.ndarray
+    dtype: type = float
+    _index: dict = field(init=False, repr=False, compare=False)
+    streams: int = field(init=False, compare=False)
+
+    def __post_init__(self):
+        ids = np.asarray(self.vehicle_ids)
+        if ids.dtype.kind in 'iu':
+            self.vehicle_ids = ids.astype(np.int32, copy=False)
+        else:
+            self.vehicle_ids = np.array([_as_vehicle_id(vid) for vid in self.vehicle_ids], dtype=np.int32)
+        # np.asarray wraps buffers already in dtype (array.array, ndarray) without copying
+        for name in ('E_t', 'S_frac', 'F_frac', 'U_frac', 'P_frac'):
+            setattr(self, name, np.asarray(getattr(self, name), dtype=self.dtype))
+        loaded = self.E_t != 0
+        self.streams = 0
+        for name, bit in _STREAM_COLUMNS:
+            if np.any(getattr(self, name)[loaded]):
+                self.streams |= bit
+        # None when ids are 1..n (row = id - 1), else {id: row}
+        if np.array_equal(self.vehicle_ids, np.arange(1, len(self.vehicle_ids) + 1)):
+            self._index = None
+        else:
+            self._index = {int(vid): i for i, vid in enumerate(self.vehicle_ids) if vid >= 0}
+
+    @classmethod
+    def from_vehicle_dict(cls, vehicle_dict: dict, dtype: type = float) -> "FleetEnergy":
+        '''Build from a CAPEX vehicle_dict (missing fields default to 0.0).'''
+        def column(key):
+            return np.array([vdata.get(key, 0.0) for vdata in vehicle_dict.values()], dtype=dtype)
+
+        return cls(
+            vehicle_ids=tuple(vehicle_dict),
+            E_t=column('E_t'),
+            S_frac=column('Private_S_t'),
+            F_frac=column('Private_F_t'),
+            U_frac=column('Private_U_t'),
+            P_frac=column('Private_t'),
+            dtype=dtype,
+        )
+
+    @classmethod
+    def from_vehicles(cls, vehicles, vehicle_ids=None, dtype: type = float) -> "FleetEnergy":
+        '''
+        Build from a list of FleetEntry (or (E_t, S, F, U, P) tuples).
+        vehicles[0] is vehicle 1 unless vehicle_ids is given.
+        '''
+        entries = [FleetEntry(*vehicle) for vehicle in vehicles]
+        columns = np.array(entries, dtype=dtype).reshape(len(entries), len(FleetEntry._fields)).T
+        if vehicle_ids is None:
+            vehicle_ids = np.arange(1, len(entries) + 1)
+        return cls(vehicle_ids, *columns, dtype=dtype)
+
+    @classmethod
+    def from_columns(cls, E_t, S=None, F=None, U=None, P=None, vehicle_ids=None, dtype=None) -> "FleetEnergy":
+        '''
+        Build from one column per field: array.array, NumPy arrays or any buffer.
+        Columns already stored in dtype are used as views, not copied
+        (array('f', ...) with dtype=np.float32). dtype defaults to the one of E_t;
+        missing share columns are zeros. E_t[0] is vehicle 1 unless vehicle_ids is given.
+        '''
+        E_t = np.asarray(E_t, dtype=dtype)
+        dtype = E_t.dtype.type
+        zeros = np.zeros(len(E_t), dtype=dtype)
+        if vehicle_ids is None:
+            vehicle_ids = np.arange(1, len(E_t) + 1, dtype=np.int32)
+        return cls(vehicle_ids, E_t,
+                   *(zeros if column is None else column for column in (S, F, U, P)),
+                   dtype=dtype)
+
+    def __len__(self):
+        return len(self.vehicle_ids)
+
+    def charging_totals(self):
+        '''Total energy charged at slow, fast and ultra chargers.'''
+        return self._total('S_frac', STREAM_SLOW), self._total('F_frac', STREAM_FAST), self._total('U_frac', STREAM_ULTRA)
+
+    def private_total(self):
+        '''Total energy refueled at private stations.'''
+        return self._total('P_frac', STREAM_PRIVATE)
+
+    def _total(self, name, bit):
+        if not self.streams & bit:
+            return 0.0
+        return float(self.E_t @ getattr(self, name))
+
+    def vehicle(self, vehicle_id):
+        '''(E_t, S, F, U, P) of one vehicle, zeros if it is not in the fleet.'''
+        vehicle_id = _as_vehicle_id(vehicle_id)
+        if self._index is None:
+            i = vehicle_id - 1 if 1 <= vehicle_id <= len(self.vehicle_ids) else None
+        else:
+            i = self._index.get(vehicle_id)
+        if i is None:
+            return 0.0, 0.0, 0.0, 0.0, 0.0
+        return (float(self.E_t[i]), float(self.S_frac[i]), float(self.F_frac[i]),
+                float(self.U_frac[i]), float(self.P_frac[i]))
+
+
+def _as_vehicle_id(vehicle_id) -> int:
+    '''Integer id of a vehicle ("3" -> 3); -1 for keys that are not integers.'''
+    try:
+        return int(vehicle_id)
+    except (TypeError, ValueError):
+        return -1
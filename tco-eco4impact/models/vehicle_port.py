@@ -1,5 +1,6 @@
 from cosapp.base import Port
 from datetime import datetime
+from models.fleet_energy import FleetEnergy
 
 class VehiclePropertiesPort(Port):
     '''
@@ -52,8 +53,8 @@ class VehiclePropertiesPort(Port):
         self.add_variable("owns_vehicle", dtype=bool, desc="True if already owns vehicle", value=False)
         self.add_variable("conversion_cost", dtype=float, desc="Conversion cost in EUR", value=0.0)
         self.add_variable("certification_cost", dtype=float, desc="Certification cost in EUR", value=0.0)
-        # Fleet dictionary
-        self.add_variable("vehicle_dict", {}, desc="Dictionary of vehicles with energy data")
+        # Fleet dictionary (or the same data as FleetEnergy arrays)
+        self.add_variable("vehicle_dict", {}, dtype=(dict, FleetEnergy), desc="Dictionary of vehicles with energy data")
         # Infrastructure parameters
         self.add_variable("n_slow", dtype=int, desc="Number of slow chargers", value=None)
         self.add_variable("n_fast", dtype=int, desc="Number of fast chargers", value=None)
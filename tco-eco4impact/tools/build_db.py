@@ -0,0 +1,41 @@
+"""
+Build the dense NumPy RV tables (`<db>_rv.npz`) from the JSON databases.
+
+Usage:
+    python tools/build_db.py [db_path ...]
+
+Without arguments, every database in database/ with country data is converted.
+"""
+import os
+import sys
+import json
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from functions.db_tables import build_rv_tables, save_rv_tables, tables_path
+
+DB_FOLDER = os.path.join(PROJECT_ROOT, "database")
+DEFAULT_DBS = ["db_trucks.json", "db_ships.json"]
+
+
+def build(db_path: str) -> bool:
+    with open(db_path, 'r') as f:
+        db = json.load(f)
+
+    if not all('data_country' in c for c in db.get('countries', [])):
+        print(f"Skipped {os.path.basename(db_path)}: no country data for RV")
+        return False
+
+    tables = build_rv_tables(db)
+    out_path = tables_path(db_path)
+    save_rv_tables(tables, out_path)
+    print(f"{os.path.basename(db_path)} -> {os.path.basename(out_path)} "
+          f"({len(tables['countries'])} countries, {len(tables['energy_types'])} energy types)")
+    return True
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:] or [os.path.join(DB_FOLDER, name) for name in DEFAULT_DBS]
+    for path in paths:
+        build(path)
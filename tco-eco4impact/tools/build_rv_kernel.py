@@ -0,0 +1,37 @@
+"""
+Ahead-of-time compile the scalar RV kernel (functions/rv_calculator._rv_kernel)
+into the extension module functions/_rv_kernel_aot.
+
+The compiled module needs neither Numba nor a JIT warm-up at runtime:
+rv_calculator uses it when it is importable and falls back to the Python /
+JIT kernel otherwise. Requires Numba (with numba.pycc) at build time only.
+
+Usage:
+    python tools/build_rv_kernel.py
+"""
+import os
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from numba.pycc import CC
+
+from functions.rv_calculator import _rv_kernel, RV_KERNEL_SIGNATURE
+
+MODULE_NAME = "_rv_kernel_aot"
+OUTPUT_DIR = os.path.join(PROJECT_ROOT, "functions")
+
+
+def build():
+    cc = CC(MODULE_NAME)
+    cc.output_dir = OUTPUT_DIR
+    # Python source of the kernel (py_func when Numba already jitted it)
+    kernel = getattr(_rv_kernel, "py_func", _rv_kernel)
+    cc.export("rv_compute", RV_KERNEL_SIGNATURE)(kernel)
+    cc.compile()
+    print(f"{MODULE_NAME} -> {OUTPUT_DIR}")
+
+
+if __name__ == "__main__":
+    build()